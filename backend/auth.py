@@ -0,0 +1,92 @@
+"""
+요청 사용자 식별.
+
+Authorization: Bearer <JWT> 헤더가 있으면 HS256 서명과 만료 시간(exp, 필수)·nbf 를 검증하고
+sub 클레임을 user_id 로 사용합니다. 토큰이 없으면 ALLOW_ANONYMOUS 설정에 따라
+"anonymous" 사용자로 처리하거나 401을 반환합니다.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request
+from pydantic import BaseModel
+
+JWT_SECRET = os.getenv("JWT_SECRET", "")
+ALLOW_ANONYMOUS = os.getenv("ALLOW_ANONYMOUS", "true").lower() in ("1", "true", "yes")
+ANONYMOUS_USER_ID = "anonymous"
+
+class CurrentUser(BaseModel):
+    user_id: str
+    is_anonymous: bool
+    # 레이트 리밋 키 (익명 사용자는 클라이언트 IP 별로 구분)
+    rate_limit_key: str
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def _numeric_claim(payload: dict, name: str) -> Optional[float]:
+    """숫자형 시간 클레임(exp, nbf) 값 (없으면 None, 숫자가 아니면 ValueError)"""
+    value = payload.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"토큰의 {name} 값이 올바르지 않습니다")
+    return float(value)
+
+def decode_jwt(token: str, secret: str) -> dict:
+    """HS256 JWT 검증 후 payload 반환 (실패 시 ValueError, exp 필수, nbf 는 있으면 확인)"""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        payload = json.loads(_b64url_decode(payload_b64))
+        signature = _b64url_decode(signature_b64)
+    except (ValueError, json.JSONDecodeError) as e:
+        raise ValueError("잘못된 토큰 형식입니다") from e
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise ValueError("잘못된 토큰 형식입니다")
+
+    if header.get("alg") != "HS256":
+        raise ValueError("지원하지 않는 토큰 알고리즘입니다")
+
+    expected = hmac.new(secret.encode("utf-8"), f"{header_b64}.{payload_b64}".encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise ValueError("토큰 서명이 올바르지 않습니다")
+
+    now = time.time()
+    expires_at = _numeric_claim(payload, "exp")
+    if expires_at is None:
+        raise ValueError("토큰에 만료 시간(exp)이 없습니다")
+    if now >= expires_at:
+        raise ValueError("만료된 토큰입니다")
+    not_before = _numeric_claim(payload, "nbf")
+    if not_before is not None and now < not_before:
+        raise ValueError("아직 사용할 수 없는 토큰입니다")
+    if not isinstance(payload.get("sub"), str) or not payload["sub"]:
+        raise ValueError("토큰에 사용자 정보(sub)가 없습니다")
+    return payload
+
+async def get_current_user(request: Request, authorization: Optional[str] = Header(None)) -> CurrentUser:
+    """요청한 사용자 정보 (FastAPI 의존성)"""
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=401, detail="Bearer 토큰이 필요합니다.")
+        if not JWT_SECRET:
+            raise HTTPException(status_code=401, detail="토큰 인증이 설정되지 않았습니다.")
+        try:
+            payload = decode_jwt(token, JWT_SECRET)
+        except ValueError as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+        user_id = str(payload["sub"])
+        return CurrentUser(user_id=user_id, is_anonymous=False, rate_limit_key=f"user:{user_id}")
+
+    if not ALLOW_ANONYMOUS:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.", headers={"WWW-Authenticate": "Bearer"})
+
+    client_host = request.client.host if request.client else "unknown"
+    return CurrentUser(user_id=ANONYMOUS_USER_ID, is_anonymous=True, rate_limit_key=f"anon:{client_host}")
@@ -0,0 +1,73 @@
+"""
+yfinance 를 대체하는 결정적(deterministic) 시세 데이터 소스.
+
+같은 종목 코드에는 항상 같은 이름/가격을 돌려주고, 실제 네트워크 호출처럼
+설정한 지연 시간만큼 호출 스레드를 블로킹합니다.
+"""
+import random
+import time
+import zlib
+from types import SimpleNamespace
+
+import pandas as pd
+
+class FakeTicker:
+    """yf.Ticker 와 같은 인터페이스(info, history)를 제공하는 가짜 종목"""
+
+    def __init__(self, symbol: str, latency: float = 0.0, jitter: float = 0.0):
+        self.symbol = symbol
+        self._latency = latency
+        self._jitter = jitter
+        # 종목 코드로 시드를 고정해 실행마다 같은 값을 돌려줌
+        self._seed = zlib.crc32(symbol.encode("utf-8"))
+        self._rng = random.Random(self._seed)
+
+    def _sleep(self):
+        delay = self._latency
+        if self._jitter:
+            delay += self._rng.uniform(0, self._jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _price(self) -> float:
+        if self.symbol.endswith(".KS"):
+            return float(5_000 + self._seed % 95_000)
+        return round(20 + (self._seed % 48_000) / 100, 2)
+
+    @property
+    def info(self) -> dict:
+        self._sleep()
+        is_korean = self.symbol.endswith(".KS")
+        return {
+            "symbol": self.symbol,
+            "longName": f"Fake {self.symbol}",
+            "exchange": "KRX" if is_korean else "NASDAQ",
+            "currency": "KRW" if is_korean else "USD",
+            "regularMarketPrice": self._price(),
+        }
+
+    def history(self, period: str = "5d", interval: str = "1d") -> pd.DataFrame:
+        self._sleep()
+        rng = random.Random(self._seed)
+        base = self._price()
+        if interval == "1mo":
+            # 월간 종가: 종목별로 고정된 랜덤 워크
+            months = int(period.rstrip("y")) * 12 if period.endswith("y") else 12
+            closes = []
+            for _ in range(months):
+                base *= 1 + rng.gauss(0.005, 0.04)
+                closes.append(round(base, 2))
+            index = pd.date_range(end=pd.Timestamp("2024-01-01"), periods=months, freq="MS")
+            return pd.DataFrame({"Close": closes}, index=index)
+        days = int(period.rstrip("d")) if period.endswith("d") else 5
+        closes = [round(base * (1 + rng.uniform(-0.02, 0.02)), 2) for _ in range(days)]
+        index = pd.date_range(end=pd.Timestamp("2024-01-31"), periods=days, freq="B")
+        return pd.DataFrame({"Close": closes}, index=index)
+
+def make_fake_yfinance(latency: float = 0.0, jitter: float = 0.0) -> SimpleNamespace:
+    """main.yf 자리에 끼워 넣을 수 있는 가짜 yfinance 모듈 생성"""
+    return SimpleNamespace(Ticker=lambda symbol: FakeTicker(symbol, latency, jitter))
+
+def install(main_module, latency: float = 0.0, jitter: float = 0.0):
+    """main 모듈의 yfinance 를 가짜 시세 소스로 교체 (get_yfinance() 가 이 값을 반환)"""
+    main_module.yf = make_fake_yfinance(latency, jitter)
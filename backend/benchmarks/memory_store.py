@@ -0,0 +1,242 @@
+"""
+PostgreSQL 없이 벤치마크를 돌릴 때 사용하는 인메모리 포트폴리오 저장소.
+
+database.py 의 포트폴리오 함수와 같은 시그니처/반환 형태를 유지하며,
+install() 로 main 모듈이 import 한 이름을 교체합니다.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from database import (
+    PortfolioCreate,
+    ETFHoldingCreate,
+    HoldingOperation,
+    PortfolioResponse,
+    VersionConflictError,
+    HoldingNotFoundError
+)
+
+class MemoryStore:
+    """포트폴리오와 ETF 보유 정보를 dict 에 보관하는 저장소"""
+
+    def __init__(self):
+        self.portfolios: dict[str, dict] = {}
+        self.holdings: dict[str, list[dict]] = {}
+
+    async def init_database(self):
+        pass
+
+    async def close_database(self):
+        pass
+
+    async def create_portfolio(self, portfolio: PortfolioCreate) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        portfolio_id = str(uuid.uuid4())
+        row = {
+            "id": portfolio_id,
+            "name": portfolio.name,
+            "description": portfolio.description,
+            "user_id": portfolio.user_id,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1
+        }
+        self.portfolios[portfolio_id] = row
+        self.holdings[portfolio_id] = []
+        return dict(row)
+
+    def _holding_rows(self, portfolio_id: str, holdings: list[ETFHoldingCreate]) -> list[dict]:
+        rows = []
+        for holding in holdings:
+            if isinstance(holding.purchase_date, str):
+                purchase_date = datetime.strptime(holding.purchase_date, '%Y-%m-%d').date()
+            else:
+                purchase_date = holding.purchase_date
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "portfolio_id": portfolio_id,
+                "symbol": holding.symbol,
+                "name": holding.name,
+                "shares": holding.shares,
+                "current_price": holding.current_price,
+                "purchase_price": holding.purchase_price,
+                "purchase_date": purchase_date,
+                "sector": holding.sector,
+                "currency": holding.currency,
+                "created_at": datetime.now(timezone.utc)
+            })
+        return rows
+
+    async def save_etf_holdings(self, portfolio_id: str, holdings: list[ETFHoldingCreate]) -> bool:
+        self.holdings[portfolio_id] = self._holding_rows(portfolio_id, holdings)
+        return True
+
+    def _owned(self, portfolio_id: str, user_id: str) -> Optional[dict]:
+        portfolio = self.portfolios.get(portfolio_id)
+        if not portfolio or portfolio["user_id"] != user_id:
+            return None
+        return portfolio
+
+    async def get_portfolio_with_holdings(self, portfolio_id: str, user_id: str = "anonymous") -> Optional[PortfolioResponse]:
+        portfolio = self._owned(portfolio_id, user_id)
+        if not portfolio:
+            return None
+
+        holdings = []
+        for row in self.holdings.get(portfolio_id, []):
+            holding = dict(row)
+            holding['purchase_date'] = holding['purchase_date'].strftime('%Y-%m-%d')
+            holdings.append(holding)
+
+        return PortfolioResponse(
+            id=portfolio['id'],
+            name=portfolio['name'],
+            description=portfolio['description'],
+            user_id=portfolio['user_id'],
+            created_at=portfolio['created_at'].isoformat(),
+            updated_at=portfolio['updated_at'].isoformat(),
+            version=portfolio['version'],
+            holdings=holdings
+        )
+
+    async def get_user_portfolios(self, user_id: str = "anonymous") -> list[dict]:
+        portfolios = [dict(p) for p in self.portfolios.values() if p["user_id"] == user_id]
+        portfolios.sort(key=lambda p: p["updated_at"], reverse=True)
+        return portfolios
+
+    async def get_portfolio_version(self, portfolio_id: str, user_id: str = "anonymous") -> Optional[dict]:
+        portfolio = self._owned(portfolio_id, user_id)
+        if not portfolio:
+            return None
+        return {"version": portfolio["version"], "updated_at": portfolio["updated_at"].isoformat()}
+
+    async def get_portfolio_sector_aggregates(self, portfolio_id: str, user_id: str = "anonymous") -> Optional[dict]:
+        # PostgreSQL 트리거가 유지하는 집계를 조회 시점에 계산해 흉내냄
+        portfolio = self._owned(portfolio_id, user_id)
+        if not portfolio:
+            return None
+        groups: dict[tuple[str, str], dict] = {}
+        for h in self.holdings.get(portfolio_id, []):
+            key = (h["sector"], h["currency"])
+            group = groups.setdefault(key, {
+                "sector": h["sector"],
+                "currency": h["currency"],
+                "holdings_count": 0,
+                "shares": 0.0,
+                "market_value": 0.0,
+                "cost_basis": 0.0
+            })
+            group["holdings_count"] += 1
+            group["shares"] += h["shares"]
+            group["market_value"] += h["shares"] * h["current_price"]
+            group["cost_basis"] += h["shares"] * h["purchase_price"]
+        return {
+            "version": portfolio["version"],
+            "updated_at": portfolio["updated_at"].isoformat(),
+            "aggregates": [groups[key] for key in sorted(groups)]
+        }
+
+    async def get_user_portfolios_fingerprint(self, user_id: str = "anonymous") -> Optional[dict]:
+        portfolios = [p for p in self.portfolios.values() if p["user_id"] == user_id]
+        updated_at = max((p["updated_at"] for p in portfolios), default=None)
+        return {
+            "count": len(portfolios),
+            "updated_at": updated_at.isoformat() if updated_at else None,
+            "versions": sum(p["version"] for p in portfolios)
+        }
+
+    async def update_portfolio(
+        self,
+        portfolio_id: str,
+        portfolio: PortfolioCreate,
+        holdings: list[ETFHoldingCreate],
+        expected_version: Optional[int] = None
+    ) -> Optional[dict]:
+        row = self._owned(portfolio_id, portfolio.user_id)
+        if not row:
+            return None
+        if expected_version is not None and row["version"] != expected_version:
+            raise VersionConflictError(row["version"])
+        row.update(
+            name=portfolio.name,
+            description=portfolio.description,
+            updated_at=datetime.now(timezone.utc),
+            version=row["version"] + 1
+        )
+        self.holdings[portfolio_id] = self._holding_rows(portfolio_id, holdings)
+        return dict(row)
+
+    async def patch_etf_holdings(
+        self,
+        portfolio_id: str,
+        expected_version: int,
+        operations: list[HoldingOperation],
+        user_id: str = "anonymous"
+    ) -> Optional[dict]:
+        row = self._owned(portfolio_id, user_id)
+        if not row:
+            return None
+        if row["version"] != expected_version:
+            raise VersionConflictError(row["version"])
+
+        # 실패 시 원래 상태를 유지하도록 복사본에 적용
+        # (database.patch_etf_holdings 와 같이 삭제 → 수정 → 추가 순서)
+        holdings = {h["id"]: dict(h) for h in self.holdings.get(portfolio_id, [])}
+        remove_ids = [op.holding_id for op in operations if op.op == "remove"]
+        for holding_id in remove_ids:
+            if holding_id not in holdings:
+                raise HoldingNotFoundError(holding_id)
+        for holding_id in set(remove_ids):
+            del holdings[holding_id]
+        for op in operations:
+            if op.op != "update":
+                continue
+            if op.holding_id not in holdings:
+                raise HoldingNotFoundError(op.holding_id)
+            changes = op.model_dump(exclude={"op", "holding_id"}, exclude_none=True)
+            if "purchase_date" in changes:
+                changes["purchase_date"] = datetime.strptime(changes["purchase_date"], '%Y-%m-%d').date()
+            holdings[op.holding_id].update(changes)
+
+        added = [
+            ETFHoldingCreate(
+                portfolio_id=portfolio_id,
+                currency=op.currency or "USD",
+                **op.model_dump(exclude={"op", "holding_id", "currency"})
+            )
+            for op in operations if op.op == "add"
+        ]
+        added_rows = self._holding_rows(portfolio_id, added)
+        self.holdings[portfolio_id] = list(holdings.values()) + added_rows
+        row.update(updated_at=datetime.now(timezone.utc), version=row["version"] + 1)
+        return {**row, "added_holding_ids": [h["id"] for h in added_rows]}
+
+    async def delete_portfolio(self, portfolio_id: str, user_id: str = "anonymous") -> bool:
+        if not self._owned(portfolio_id, user_id):
+            return False
+        self.holdings.pop(portfolio_id, None)
+        return self.portfolios.pop(portfolio_id, None) is not None
+
+# main.py 가 database 모듈에서 import 하는 함수 이름들
+STORE_FUNCTIONS = (
+    "init_database",
+    "close_database",
+    "create_portfolio",
+    "save_etf_holdings",
+    "get_portfolio_with_holdings",
+    "get_user_portfolios",
+    "get_portfolio_version",
+    "get_portfolio_sector_aggregates",
+    "get_user_portfolios_fingerprint",
+    "update_portfolio",
+    "patch_etf_holdings",
+    "delete_portfolio",
+)
+
+def install(main_module) -> MemoryStore:
+    """main 모듈의 데이터베이스 함수를 인메모리 저장소로 교체"""
+    store = MemoryStore()
+    for name in STORE_FUNCTIONS:
+        setattr(main_module, name, getattr(store, name))
+    return store
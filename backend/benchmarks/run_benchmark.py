@@ -0,0 +1,418 @@
+"""
+ETF 리밸런서 API 부하/성능 벤치마크.
+
+FastAPI 앱을 프로세스 안에서(ASGI) 직접 구동하고, yfinance 는 지연 시간을
+설정할 수 있는 가짜 시세 소스로 교체한 뒤 시나리오별로 지정한 동시성에서
+요청을 보내 p50/p95/p99 지연 시간과 처리량을 측정합니다.
+
+사용 예 (backend 디렉터리에서 실행):
+    python -m benchmarks.run_benchmark --concurrency 1,8,32 --output bench.json
+    python -m benchmarks.run_benchmark --database postgres --baseline bench.json
+
+실행마다 새로 만든 벤치마크 전용 사용자(JWT)로 요청하고,
+동시성 단계가 끝날 때마다 그 사용자의 포트폴리오를 모두 삭제합니다.
+--output 이 없으면 결과 JSON 을 stdout 으로 출력하며, 이때 앱 로그는 stderr 로 보냅니다.
+
+--baseline 을 지정하면 이전 결과와 비교해 p95 지연 또는 처리량이
+--max-regression 비율 이상 나빠진 항목이 있을 때 종료 코드 1을 반환합니다.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
+import platform
+import secrets
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+import main
+import database
+import auth
+import logging_config
+import migrations
+import rate_limit
+from rebalance import TARGET_ALLOCATION, calculate_sector_rebalance_recommendations
+from benchmarks import fake_market, memory_store
+
+STOCK_SYMBOLS = ["SPY", "QQQ", "SCHD", "GLD", "BND", "069500", "102110", "148070"]
+ALL_SCENARIOS = [
+    "root",
+    "stock_quote",
+    "portfolio_create",
+    "portfolio_list",
+    "portfolio_get",
+    "portfolio_get_cached",
+    "portfolio_sectors",
+    "portfolio_update",
+    "portfolio_patch",
+    "portfolio_delete",
+    "portfolio_simulate",
+    "rebalance",
+]
+
+def make_holdings(count: int) -> list[dict]:
+    """요청 본문에 들어갈 ETF 보유 목록 생성 (프론트엔드 camelCase 형식)"""
+    sectors = list(TARGET_ALLOCATION.keys())
+    holdings = []
+    for i in range(count):
+        symbol = STOCK_SYMBOLS[i % len(STOCK_SYMBOLS)]
+        holdings.append({
+            "symbol": symbol,
+            "name": f"{symbol} ETF",
+            "shares": 10 + i,
+            "currentPrice": 100.0 + i,
+            "purchasePrice": 90.0 + i,
+            "purchaseDate": "2024-01-15",
+            "sector": sectors[i % len(sectors)],
+            "currency": "KRW" if symbol.isdigit() else "USD"
+        })
+    return holdings
+
+def to_db_holdings(holdings: list[dict]) -> list[dict]:
+    """camelCase 보유 목록을 DB 조회 결과 형식으로 변환 (리밸런싱 계산용)"""
+    return [
+        {
+            "symbol": h["symbol"],
+            "shares": h["shares"],
+            "current_price": h["currentPrice"],
+            "sector": h["sector"],
+            "currency": h["currency"]
+        }
+        for h in holdings
+    ]
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def run_scenario(
+    name: str,
+    call: Callable[[int], Awaitable[Optional[int]]],
+    total: int,
+    concurrency: int
+) -> dict:
+    """call(i) 를 total 번, concurrency 개의 워커로 실행하고 지연 시간 통계 반환"""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                status = await call(index)
+                if status is not None and status >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 6),
+        "throughput_rps": round(total / elapsed, 3) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+async def create_seed_portfolios(client: httpx.AsyncClient, count: int, holdings: list[dict]) -> list[str]:
+    """조회/수정/삭제 시나리오에서 사용할 포트폴리오 미리 생성"""
+    ids = []
+    for i in range(count):
+        response = await client.post("/api/portfolios", json={
+            "name": f"bench-seed-{i}",
+            "description": "benchmark",
+            "etf_holdings": holdings
+        })
+        response.raise_for_status()
+        ids.append(response.json()["portfolio_id"])
+    return ids
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def make_benchmark_token(user_id: str, secret: str, ttl: int = 24 * 3600) -> str:
+    """벤치마크 전용 사용자의 HS256 JWT 생성"""
+    header = _b64url_encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode("utf-8"))
+    payload = _b64url_encode(json.dumps({"sub": user_id, "exp": int(time.time()) + ttl}).encode("utf-8"))
+    signature = hmac.new(secret.encode("utf-8"), f"{header}.{payload}".encode("ascii"), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64url_encode(signature)}"
+
+async def delete_user_portfolios(user_id: str) -> int:
+    """벤치마크 사용자가 만든 포트폴리오 전부 삭제"""
+    portfolios = await main.get_user_portfolios(user_id)
+    for portfolio in portfolios:
+        await main.delete_portfolio(portfolio["id"], user_id)
+    return len(portfolios)
+
+async def run_concurrency_level(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    concurrency: int,
+    holdings: list[dict],
+    db_holdings: list[dict]
+) -> list[dict]:
+    """한 동시성 단계에서 선택한 시나리오를 모두 실행"""
+    results = []
+    total = args.requests
+    seed_ids: list[str] = []
+    if {"portfolio_get", "portfolio_get_cached", "portfolio_sectors", "portfolio_update", "portfolio_patch", "portfolio_delete", "portfolio_simulate"} & set(args.scenarios):
+        seed_ids = await create_seed_portfolios(client, max(concurrency, 1) * 2, holdings)
+    delete_ids: list[str] = []
+    if "portfolio_delete" in args.scenarios:
+        delete_ids = await create_seed_portfolios(client, total, holdings)
+
+    async def root(i: int) -> int:
+        return (await client.get("/")).status_code
+
+    async def stock_quote(i: int) -> int:
+        symbol = STOCK_SYMBOLS[i % len(STOCK_SYMBOLS)]
+        return (await client.get(f"/api/stock/{symbol}")).status_code
+
+    async def portfolio_create(i: int) -> int:
+        return (await client.post("/api/portfolios", json={
+            "name": f"bench-{i}",
+            "etf_holdings": holdings
+        })).status_code
+
+    async def portfolio_list(i: int) -> int:
+        return (await client.get("/api/portfolios")).status_code
+
+    async def portfolio_get(i: int) -> int:
+        return (await client.get(f"/api/portfolios/{seed_ids[i % len(seed_ids)]}")).status_code
+
+    etags: dict[str, str] = {}
+
+    async def portfolio_get_cached(i: int) -> int:
+        # 이미 받은 ETag 로 재검증 (변경이 없으면 304)
+        portfolio_id = seed_ids[i % len(seed_ids)]
+        headers = {"If-None-Match": etags[portfolio_id]} if portfolio_id in etags else {}
+        response = await client.get(f"/api/portfolios/{portfolio_id}", headers=headers)
+        if "etag" in response.headers:
+            etags[portfolio_id] = response.headers["etag"]
+        return response.status_code
+
+    async def portfolio_sectors(i: int) -> int:
+        return (await client.get(f"/api/portfolios/{seed_ids[i % len(seed_ids)]}/sectors")).status_code
+
+    async def portfolio_update(i: int) -> int:
+        return (await client.put(f"/api/portfolios/{seed_ids[i % len(seed_ids)]}", json={
+            "name": f"bench-updated-{i}",
+            "etf_holdings": holdings
+        })).status_code
+
+    # portfolio_patch 대상 보유 정보 ID 와 버전 (시나리오 시작 전에 한 번 조회하고 PATCH 응답으로 갱신)
+    patch_targets: dict[str, dict] = {}
+
+    async def prepare_patch_targets():
+        for portfolio_id in seed_ids:
+            portfolio = (await client.get(f"/api/portfolios/{portfolio_id}")).json()
+            patch_targets[portfolio_id] = {"version": portfolio["version"], "holding_id": portfolio["holdings"][0]["id"]}
+
+    async def portfolio_patch(i: int) -> int:
+        # 보유 종목 하나의 수량만 변경 (PATCH 요청만 측정해 portfolio_update 와 비교 가능)
+        portfolio_id = seed_ids[i % len(seed_ids)]
+        target = patch_targets[portfolio_id]
+        response = await client.patch(f"/api/portfolios/{portfolio_id}/holdings", json={
+            "version": target["version"],
+            "operations": [{"op": "update", "id": target["holding_id"], "shares": 10 + i}]
+        })
+        if response.status_code == 200:
+            target["version"] = response.json()["portfolio"]["version"]
+        elif response.status_code == 409:
+            # 같은 포트폴리오에 요청이 겹친 경우 (오류로 집계하고 다음 요청부터 최신 버전 사용)
+            target["version"] = response.json()["detail"]["current_version"]
+        return response.status_code
+
+    async def portfolio_delete(i: int) -> int:
+        return (await client.delete(f"/api/portfolios/{delete_ids[i]}")).status_code
+
+    async def portfolio_simulate(i: int) -> int:
+        # 월 500만원 적립, 10년, Monte Carlo 1,000 경로
+        return (await client.post(f"/api/portfolios/{seed_ids[i % len(seed_ids)]}/simulate", json={
+            "months": 120,
+            "paths": 1000,
+            "priceModel": "monte_carlo",
+            "cashFlows": [{"amount": 5_000_000}],
+            "seed": i
+        })).status_code
+
+    async def rebalance(i: int) -> None:
+        calculate_sector_rebalance_recommendations(db_holdings)
+
+    calls: dict[str, Callable[[int], Awaitable[Optional[int]]]] = dict(
+        root=root,
+        stock_quote=stock_quote,
+        portfolio_create=portfolio_create,
+        portfolio_list=portfolio_list,
+        portfolio_get=portfolio_get,
+        portfolio_get_cached=portfolio_get_cached,
+        portfolio_sectors=portfolio_sectors,
+        portfolio_update=portfolio_update,
+        portfolio_patch=portfolio_patch,
+        portfolio_delete=portfolio_delete,
+        portfolio_simulate=portfolio_simulate,
+        rebalance=rebalance
+    )
+
+    for name in args.scenarios:
+        if name == "portfolio_patch":
+            # 앞선 portfolio_update 가 보유 정보를 교체하므로 측정 직전에 준비
+            await prepare_patch_targets()
+        result = await run_scenario(name, calls[name], total, concurrency)
+        results.append(result)
+        print(
+            f"{name:<22} c={concurrency:<4} p50={result['p50_ms']:>9.3f}ms "
+            f"p95={result['p95_ms']:>9.3f}ms p99={result['p99_ms']:>9.3f}ms "
+            f"rps={result['throughput_rps']:>10.1f} errors={result['errors']}",
+            file=sys.stderr
+        )
+    return results
+
+async def run_benchmarks(args: argparse.Namespace) -> dict:
+    # 요청마다 찍히는 httpx 클라이언트 로그가 측정에 섞이지 않도록 함
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # 앱 로그가 stdout 으로 출력하는 결과 JSON 과 섞이지 않게 stderr 로 보냄
+    logging_config.set_log_stream(sys.stderr)
+    # 레이트 리밋은 측정 대상 처리량 자체를 제한하므로 기본적으로 끔
+    rate_limit.rate_limiter.enabled = args.rate_limit
+    fake_market.install(main, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    if args.database == "memory":
+        memory_store.install(main)
+    else:
+        await migrations.migrate_database()
+    await main.init_database()
+
+    # 실제 사용자 데이터와 섞이지 않도록 실행마다 새 사용자로 요청
+    if not auth.JWT_SECRET:
+        auth.JWT_SECRET = secrets.token_hex(32)
+    user_id = f"benchmark-{uuid.uuid4().hex[:12]}"
+    headers = {"Authorization": f"Bearer {make_benchmark_token(user_id, auth.JWT_SECRET)}"}
+
+    holdings = make_holdings(args.holdings)
+    db_holdings = to_db_holdings(holdings)
+    results = []
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", headers=headers) as client:
+        for concurrency in args.concurrency:
+            try:
+                results.extend(await run_concurrency_level(client, args, concurrency, holdings, db_holdings))
+            finally:
+                # 단계마다 빈 상태에서 시작해야 portfolio_list 등이 실행 순서와 무관하게 비교 가능
+                await delete_user_portfolios(user_id)
+
+    await main.close_database()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.database,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "holdings": args.holdings,
+            "requests": args.requests,
+            "rate_limit": args.rate_limit,
+            "concurrency": args.concurrency,
+            "user_id": user_id,
+            "db_host": database.DB_HOST if args.database == "postgres" else None
+        },
+        "results": results
+    }
+
+def compare_results(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    """baseline 대비 p95 지연 증가 또는 처리량 감소가 허용치를 넘는 항목 반환"""
+    baseline_index = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_index.get((result["scenario"], result["concurrency"]))
+        if not previous:
+            continue
+        key = f"{result['scenario']} c={result['concurrency']}"
+        if previous["p95_ms"] > 0 and result["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{key}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if previous["throughput_rps"] > 0 and result["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{key}: throughput {previous['throughput_rps']} -> {result['throughput_rps']} rps")
+        if result["errors"] > previous["errors"]:
+            regressions.append(f"{key}: errors {previous['errors']} -> {result['errors']}")
+    return regressions
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ETF 리밸런서 API 벤치마크")
+    parser.add_argument("--database", choices=["memory", "postgres"], default="memory",
+                        help="memory: 인메모리 저장소, postgres: DB_* 환경 변수의 PostgreSQL")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="쉼표로 구분한 동시성 목록 (기본값: 1,8,32)")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오/동시성별 요청 수")
+    parser.add_argument("--holdings", type=int, default=10, help="포트폴리오당 ETF 보유 종목 수")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="가짜 시세 소스 호출 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="가짜 시세 소스 추가 지연 최대값 (ms)")
+    parser.add_argument("--scenarios", default=",".join(ALL_SCENARIOS),
+                        help=f"실행할 시나리오 (기본값: 전체 - {','.join(ALL_SCENARIOS)})")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="사용자/라우트별 레이트 리밋을 켠 상태로 측정 (한도 초과 요청은 errors 로 집계)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="허용하는 성능 저하 비율 (기본값: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(ALL_SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    return args
+
+def main_cli(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.max_regression)
+        if regressions:
+            print("성능 저하 감지:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            return 1
+        print("baseline 대비 성능 저하 없음", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
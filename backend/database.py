@@ -1,11 +1,14 @@
 import os
-from typing import Optional
+from typing import Optional, Literal
 import asyncpg
 from pydantic import BaseModel
 from datetime import datetime, date
 import json
+import logging
 from dotenv import load_dotenv
 
+from migrations import check_schema
+
 # .env 파일 로드
 load_dotenv()
 
@@ -16,12 +19,17 @@ DB_NAME = os.getenv("DB_NAME", "etf_rebalancer")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 
+logger = logging.getLogger(__name__)
+
 # 데이터베이스 연결 풀
 connection_pool = None
 
+# 기동 시 확인한 스키마 버전 (연결 실패 시 None)
+schema_version: Optional[int] = None
+
 async def init_database():
     """데이터베이스 연결 풀 초기화"""
-    global connection_pool
+    global connection_pool, schema_version
     try:
         connection_pool = await asyncpg.create_pool(
             host=DB_HOST,
@@ -32,68 +40,20 @@ async def init_database():
             min_size=2,
             max_size=10
         )
-        print("✅ PostgreSQL 연결 성공")
+        logger.info("PostgreSQL 연결 성공")
         
-        # 테이블 생성
-        await create_tables()
+        # 스키마 버전 확인 (DDL 은 python migrations.py 로 배포 시 실행)
+        async with connection_pool.acquire() as conn:
+            schema_version = await check_schema(conn)
         
     except Exception as e:
-        print(f"❌ PostgreSQL 연결 실패: {e}")
-        print(f"연결 정보: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-
-async def create_tables():
-    """필요한 테이블 생성"""
-    if not connection_pool:
-        return
-    
-    async with connection_pool.acquire() as conn:
-        # portfolios 테이블
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS portfolios (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                name TEXT NOT NULL,
-                description TEXT,
-                user_id TEXT NOT NULL DEFAULT 'anonymous',
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-        """)
-        
-        # etf_holdings 테이블
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS etf_holdings (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                portfolio_id UUID REFERENCES portfolios(id) ON DELETE CASCADE,
-                symbol TEXT NOT NULL,
-                name TEXT NOT NULL,
-                shares DECIMAL(15, 6) NOT NULL,
-                current_price DECIMAL(15, 6) NOT NULL,
-                purchase_price DECIMAL(15, 6) NOT NULL,
-                purchase_date DATE NOT NULL,
-                sector TEXT NOT NULL,
-                currency TEXT NOT NULL DEFAULT 'USD',
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-        """)
-        
-        # 인덱스 생성
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_portfolios_user_id 
-            ON portfolios(user_id);
-        """)
-        
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_etf_holdings_portfolio_id 
-            ON etf_holdings(portfolio_id);
-        """)
-        
-        print("✅ 테이블 생성 완료")
+        logger.error(f"PostgreSQL 연결 실패: {e}", extra={"db": f"{DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}"})
 
 async def close_database():
     """데이터베이스 연결 풀 종료"""
     if connection_pool:
         await connection_pool.close()
-        print("✅ 데이터베이스 연결 종료")
+        logger.info("데이터베이스 연결 종료")
 
 # 데이터베이스 모델 정의
 class PortfolioCreate(BaseModel):
@@ -112,6 +72,19 @@ class ETFHoldingCreate(BaseModel):
     sector: str
     currency: str = "USD"
 
+class HoldingOperation(BaseModel):
+    """ETF 보유 정보 부분 수정 연산 (add/update/remove)"""
+    op: Literal["add", "update", "remove"]
+    holding_id: Optional[str] = None
+    symbol: Optional[str] = None
+    name: Optional[str] = None
+    shares: Optional[float] = None
+    current_price: Optional[float] = None
+    purchase_price: Optional[float] = None
+    purchase_date: Optional[str] = None
+    sector: Optional[str] = None
+    currency: Optional[str] = None
+
 class PortfolioResponse(BaseModel):
     id: str
     name: str
@@ -119,8 +92,35 @@ class PortfolioResponse(BaseModel):
     user_id: str
     created_at: str
     updated_at: str
+    version: int = 1
     holdings: list[dict] = []
 
+class VersionConflictError(Exception):
+    """클라이언트가 가진 포트폴리오 버전이 최신이 아님"""
+    def __init__(self, current_version: int):
+        super().__init__(f"포트폴리오 버전 충돌 (현재 버전: {current_version})")
+        self.current_version = current_version
+
+class HoldingNotFoundError(Exception):
+    """수정/삭제할 ETF 보유 정보가 포트폴리오에 없음"""
+    def __init__(self, holding_id: str):
+        super().__init__(f"ETF 보유 정보를 찾을 수 없습니다: {holding_id}")
+        self.holding_id = holding_id
+
+def _parse_purchase_date(purchase_date) -> Optional[date]:
+    """문자열 날짜를 datetime.date 객체로 변환"""
+    if isinstance(purchase_date, str):
+        return datetime.strptime(purchase_date, '%Y-%m-%d').date()
+    return purchase_date
+
+async def _raise_if_version_conflict(conn, portfolio_id: str, user_id: str):
+    """포트폴리오가 존재하면 VersionConflictError, 없으면 그대로 반환 (404 처리용)"""
+    current_version = await conn.fetchval("""
+        SELECT version FROM portfolios WHERE id = $1 AND user_id = $2
+    """, portfolio_id, user_id)
+    if current_version is not None:
+        raise VersionConflictError(current_version)
+
 # 포트폴리오 데이터베이스 작업
 async def create_portfolio(portfolio: PortfolioCreate) -> Optional[dict]:
     """새 포트폴리오 생성"""
@@ -132,7 +132,7 @@ async def create_portfolio(portfolio: PortfolioCreate) -> Optional[dict]:
             result = await conn.fetchrow("""
                 INSERT INTO portfolios (name, description, user_id, created_at, updated_at)
                 VALUES ($1, $2, $3, $4, $5)
-                RETURNING id, name, description, user_id, created_at, updated_at
+                RETURNING id, name, description, user_id, created_at, updated_at, version
             """, 
             portfolio.name, 
             portfolio.description, 
@@ -148,7 +148,7 @@ async def create_portfolio(portfolio: PortfolioCreate) -> Optional[dict]:
                 return result_dict
             return None
     except Exception as e:
-        print(f"포트폴리오 생성 오류: {e}")
+        logger.exception(f"포트폴리오 생성 오류: {e}")
         return None
 
 async def save_etf_holdings(portfolio_id: str, holdings: list[ETFHoldingCreate]) -> bool:
@@ -167,12 +167,7 @@ async def save_etf_holdings(portfolio_id: str, holdings: list[ETFHoldingCreate])
             if holdings:
                 values = []
                 for holding in holdings:
-                    # 문자열 날짜를 datetime.date 객체로 변환
-                    if isinstance(holding.purchase_date, str):
-                        purchase_date = datetime.strptime(holding.purchase_date, '%Y-%m-%d').date()
-                    else:
-                        purchase_date = holding.purchase_date
-                    
+                    purchase_date = _parse_purchase_date(holding.purchase_date)
                     values.append((
                         portfolio_id,
                         holding.symbol,
@@ -195,10 +190,10 @@ async def save_etf_holdings(portfolio_id: str, holdings: list[ETFHoldingCreate])
             
             return True
     except Exception as e:
-        print(f"ETF 보유 정보 저장 오류: {e}")
+        logger.exception(f"ETF 보유 정보 저장 오류: {e}")
         return False
 
-async def get_portfolio_with_holdings(portfolio_id: str) -> Optional[PortfolioResponse]:
+async def get_portfolio_with_holdings(portfolio_id: str, user_id: str = "anonymous") -> Optional[PortfolioResponse]:
     """포트폴리오와 보유 정보 조회"""
     if not connection_pool:
         return None
@@ -207,10 +202,10 @@ async def get_portfolio_with_holdings(portfolio_id: str) -> Optional[PortfolioRe
         async with connection_pool.acquire() as conn:
             # 포트폴리오 조회
             portfolio_result = await conn.fetchrow("""
-                SELECT id, name, description, user_id, created_at, updated_at
+                SELECT id, name, description, user_id, created_at, updated_at, version
                 FROM portfolios 
-                WHERE id = $1
-            """, portfolio_id)
+                WHERE id = $1 AND user_id = $2
+            """, portfolio_id, user_id)
             
             if not portfolio_result:
                 return None
@@ -244,10 +239,11 @@ async def get_portfolio_with_holdings(portfolio_id: str) -> Optional[PortfolioRe
                 user_id=portfolio_result['user_id'],
                 created_at=portfolio_result['created_at'].isoformat(),
                 updated_at=portfolio_result['updated_at'].isoformat(),
+                version=portfolio_result['version'],
                 holdings=holdings
             )
     except Exception as e:
-        print(f"포트폴리오 조회 오류: {e}")
+        logger.exception(f"포트폴리오 조회 오류: {e}")
         return None
 
 async def get_user_portfolios(user_id: str = "anonymous") -> list[dict]:
@@ -258,7 +254,7 @@ async def get_user_portfolios(user_id: str = "anonymous") -> list[dict]:
     try:
         async with connection_pool.acquire() as conn:
             result = await conn.fetch("""
-                SELECT id, name, description, user_id, created_at, updated_at
+                SELECT id, name, description, user_id, created_at, updated_at, version
                 FROM portfolios 
                 WHERE user_id = $1
                 ORDER BY updated_at DESC
@@ -273,56 +269,134 @@ async def get_user_portfolios(user_id: str = "anonymous") -> list[dict]:
             
             return portfolios
     except Exception as e:
-        print(f"사용자 포트폴리오 조회 오류: {e}")
+        logger.exception(f"사용자 포트폴리오 조회 오류: {e}")
         return []
 
-async def update_portfolio(portfolio_id: str, portfolio: PortfolioCreate, holdings: list[ETFHoldingCreate]) -> Optional[dict]:
-    """포트폴리오 업데이트"""
+async def get_portfolio_version(portfolio_id: str, user_id: str = "anonymous") -> Optional[dict]:
+    """포트폴리오 버전/수정 시각만 조회 (보유 정보는 읽지 않음, ETag 검증용)"""
     if not connection_pool:
-        print("❌ 데이터베이스 연결 풀이 없습니다")
         return None
     
     try:
-        print(f"🔄 포트폴리오 업데이트 시작 - ID: {portfolio_id}")
+        async with connection_pool.acquire() as conn:
+            result = await conn.fetchrow("""
+                SELECT version, updated_at
+                FROM portfolios 
+                WHERE id = $1 AND user_id = $2
+            """, portfolio_id, user_id)
+            
+            if not result:
+                return None
+            return {"version": result['version'], "updated_at": result['updated_at'].isoformat()}
+    except Exception as e:
+        logger.exception(f"포트폴리오 버전 조회 오류: {e}")
+        return None
+
+async def get_portfolio_sector_aggregates(portfolio_id: str, user_id: str = "anonymous") -> Optional[dict]:
+    """포트폴리오의 섹터/통화별 집계 조회 (포트폴리오가 없으면 None)"""
+    if not connection_pool:
+        return None
+    
+    try:
+        async with connection_pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT p.version, p.updated_at, a.sector, a.currency, a.holdings_count,
+                       a.shares, a.market_value, a.cost_basis
+                FROM portfolios p
+                LEFT JOIN portfolio_sector_aggregates a ON a.portfolio_id = p.id
+                WHERE p.id = $1 AND p.user_id = $2
+                ORDER BY a.sector, a.currency
+            """, portfolio_id, user_id)
+            
+            if not rows:
+                return None
+            
+            # DECIMAL 값을 float 으로 변환
+            aggregates = [
+                {
+                    "sector": row['sector'],
+                    "currency": row['currency'],
+                    "holdings_count": row['holdings_count'],
+                    "shares": float(row['shares']),
+                    "market_value": float(row['market_value']),
+                    "cost_basis": float(row['cost_basis'])
+                }
+                for row in rows if row['sector'] is not None
+            ]
+            return {
+                "version": rows[0]['version'],
+                "updated_at": rows[0]['updated_at'].isoformat(),
+                "aggregates": aggregates
+            }
+    except Exception as e:
+        logger.exception(f"섹터 집계 조회 오류: {e}")
+        return None
+
+async def get_user_portfolios_fingerprint(user_id: str = "anonymous") -> Optional[dict]:
+    """사용자 포트폴리오 목록이 바뀌었는지 판단할 요약 값 조회 (ETag 검증용)"""
+    if not connection_pool:
+        return None
+    
+    try:
+        async with connection_pool.acquire() as conn:
+            result = await conn.fetchrow("""
+                SELECT COUNT(*) AS count, MAX(updated_at) AS updated_at, COALESCE(SUM(version), 0) AS versions
+                FROM portfolios 
+                WHERE user_id = $1
+            """, user_id)
+            
+            updated_at = result['updated_at'].isoformat() if result['updated_at'] else None
+            return {"count": result['count'], "updated_at": updated_at, "versions": result['versions']}
+    except Exception as e:
+        logger.exception(f"사용자 포트폴리오 요약 조회 오류: {e}")
+        return None
+
+async def update_portfolio(
+    portfolio_id: str,
+    portfolio: PortfolioCreate,
+    holdings: list[ETFHoldingCreate],
+    expected_version: Optional[int] = None
+) -> Optional[dict]:
+    """포트폴리오 업데이트 (expected_version 지정 시 버전이 다르면 VersionConflictError)"""
+    if not connection_pool:
+        logger.error("데이터베이스 연결 풀이 없습니다")
+        return None
+    
+    try:
         async with connection_pool.acquire() as conn:
             # 트랜잭션 시작
             async with conn.transaction():
                 # 포트폴리오 정보 업데이트
-                print(f"📝 포트폴리오 기본 정보 업데이트: {portfolio.name}")
                 portfolio_result = await conn.fetchrow("""
                     UPDATE portfolios 
-                    SET name = $1, description = $2, updated_at = $3
-                    WHERE id = $4
-                    RETURNING id, name, description, user_id, created_at, updated_at
+                    SET name = $1, description = $2, updated_at = $3, version = version + 1
+                    WHERE id = $4 AND user_id = $5 AND ($6::INTEGER IS NULL OR version = $6)
+                    RETURNING id, name, description, user_id, created_at, updated_at, version
                 """, 
                 portfolio.name, 
                 portfolio.description, 
                 datetime.now(),
-                portfolio_id
+                portfolio_id,
+                portfolio.user_id,
+                expected_version
                 )
                 
                 if not portfolio_result:
-                    print(f"❌ 포트폴리오를 찾을 수 없습니다 - ID: {portfolio_id}")
+                    if expected_version is not None:
+                        await _raise_if_version_conflict(conn, portfolio_id, portfolio.user_id)
+                    logger.warning("포트폴리오를 찾을 수 없습니다", extra={"portfolio_id": portfolio_id})
                     return None
                 
                 # 기존 보유 정보 삭제
-                print(f"🗑️ 기존 ETF 보유 정보 삭제")
-                delete_result = await conn.execute("""
+                await conn.execute("""
                     DELETE FROM etf_holdings WHERE portfolio_id = $1
                 """, portfolio_id)
-                print(f"🗑️ 삭제된 행 수: {delete_result}")
                 
                 # 새 보유 정보 삽입
                 if holdings:
-                    print(f"💾 새 ETF 보유 정보 삽입 - {len(holdings)}개")
                     values = []
                     for holding in holdings:
-                        # 문자열 날짜를 datetime.date 객체로 변환
-                        if isinstance(holding.purchase_date, str):
-                            purchase_date = datetime.strptime(holding.purchase_date, '%Y-%m-%d').date()
-                        else:
-                            purchase_date = holding.purchase_date
-                        
+                        purchase_date = _parse_purchase_date(holding.purchase_date)
                         values.append((
                             portfolio_id,
                             holding.symbol,
@@ -342,20 +416,139 @@ async def update_portfolio(portfolio_id: str, portfolio: PortfolioCreate, holdin
                          purchase_date, sector, currency, created_at)
                         VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
                     """, values)
-                    print(f"✅ ETF 보유 정보 삽입 완료")
                 
                 # UUID 객체를 문자열로 변환
                 result_dict = dict(portfolio_result)
                 result_dict['id'] = str(result_dict['id'])
-                print(f"✅ 포트폴리오 업데이트 완료 - ID: {portfolio_id}")
+                logger.info("포트폴리오 업데이트 완료", extra={
+                    "sample": True,
+                    "portfolio_id": portfolio_id,
+                    "holdings": len(holdings)
+                })
                 return result_dict
+    except VersionConflictError:
+        raise
     except Exception as e:
-        print(f"❌ 포트폴리오 업데이트 오류: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"포트폴리오 업데이트 오류: {e}", extra={"portfolio_id": portfolio_id})
+        return None
+
+async def patch_etf_holdings(
+    portfolio_id: str,
+    expected_version: int,
+    operations: list[HoldingOperation],
+    user_id: str = "anonymous"
+) -> Optional[dict]:
+    """
+    ETF 보유 정보 부분 수정.
+    버전이 일치할 때만 연산을 적용하고 버전을 1 올립니다.
+    연산은 목록 순서와 무관하게 삭제(remove) → 수정(update) → 추가(add) 순으로 적용하므로,
+    같은 보유 정보를 한 요청에서 삭제하면서 수정하면 HoldingNotFoundError 가 됩니다.
+    반환값의 added_holding_ids 는 추가한 보유 정보 ID (add 연산 순서).
+    포트폴리오가 없으면 None, 버전이 다르면 VersionConflictError,
+    대상 보유 정보가 없으면 HoldingNotFoundError (모두 롤백됨).
+    """
+    if not connection_pool:
+        logger.error("데이터베이스 연결 풀이 없습니다")
         return None
+    
+    async with connection_pool.acquire() as conn:
+        async with conn.transaction():
+            # 버전 확인과 증가를 한 번에 처리 (동시 수정 시 한쪽만 성공)
+            try:
+                portfolio_result = await conn.fetchrow("""
+                    UPDATE portfolios 
+                    SET updated_at = $1, version = version + 1
+                    WHERE id = $2 AND user_id = $3 AND version = $4
+                    RETURNING id, name, description, user_id, created_at, updated_at, version
+                """, datetime.now(), portfolio_id, user_id, expected_version)
+            except asyncpg.DataError:
+                # UUID 형식이 아닌 ID 는 다른 조회와 같이 없는 포트폴리오로 처리
+                logger.warning("포트폴리오를 찾을 수 없습니다", extra={"portfolio_id": portfolio_id})
+                return None
+            
+            if not portfolio_result:
+                await _raise_if_version_conflict(conn, portfolio_id, user_id)
+                return None
+            
+            # 삭제
+            remove_ids = [op.holding_id for op in operations if op.op == "remove"]
+            if remove_ids:
+                deleted_ids = await conn.fetch("""
+                    DELETE FROM etf_holdings 
+                    WHERE portfolio_id = $1 AND id = ANY($2::UUID[])
+                    RETURNING id
+                """, portfolio_id, remove_ids)
+                if len(deleted_ids) != len(set(remove_ids)):
+                    found = {str(row['id']) for row in deleted_ids}
+                    raise HoldingNotFoundError(next(i for i in remove_ids if i not in found))
+            
+            # 수정 (전달된 필드만 변경)
+            for op in operations:
+                if op.op != "update":
+                    continue
+                updated_id = await conn.fetchval("""
+                    UPDATE etf_holdings 
+                    SET symbol = COALESCE($3, symbol),
+                        name = COALESCE($4, name),
+                        shares = COALESCE($5, shares),
+                        current_price = COALESCE($6, current_price),
+                        purchase_price = COALESCE($7, purchase_price),
+                        purchase_date = COALESCE($8, purchase_date),
+                        sector = COALESCE($9, sector),
+                        currency = COALESCE($10, currency)
+                    WHERE portfolio_id = $1 AND id = $2
+                    RETURNING id
+                """,
+                portfolio_id,
+                op.holding_id,
+                op.symbol,
+                op.name,
+                op.shares,
+                op.current_price,
+                op.purchase_price,
+                _parse_purchase_date(op.purchase_date),
+                op.sector,
+                op.currency
+                )
+                if updated_id is None:
+                    raise HoldingNotFoundError(op.holding_id)
+            
+            # 추가 (클라이언트가 다시 조회하지 않도록 새 ID 를 연산 순서대로 반환)
+            added_ids = []
+            for op in operations:
+                if op.op != "add":
+                    continue
+                added_id = await conn.fetchval("""
+                    INSERT INTO etf_holdings 
+                    (portfolio_id, symbol, name, shares, current_price, purchase_price, 
+                     purchase_date, sector, currency, created_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    RETURNING id
+                """,
+                portfolio_id,
+                op.symbol,
+                op.name,
+                op.shares,
+                op.current_price,
+                op.purchase_price,
+                _parse_purchase_date(op.purchase_date),
+                op.sector,
+                op.currency or "USD",
+                datetime.now()
+                )
+                added_ids.append(str(added_id))
+            
+            result_dict = dict(portfolio_result)
+            result_dict['id'] = str(result_dict['id'])
+            result_dict['added_holding_ids'] = added_ids
+            logger.info("ETF 보유 정보 부분 수정 완료", extra={
+                "sample": True,
+                "portfolio_id": portfolio_id,
+                "operations": len(operations)
+            })
+            return result_dict
 
-async def delete_portfolio(portfolio_id: str) -> bool:
+async def delete_portfolio(portfolio_id: str, user_id: str = "anonymous") -> bool:
     """포트폴리오 삭제"""
     if not connection_pool:
         return False
@@ -364,10 +557,10 @@ async def delete_portfolio(portfolio_id: str) -> bool:
         async with connection_pool.acquire() as conn:
             # CASCADE로 인해 etf_holdings도 자동 삭제됨
             result = await conn.execute("""
-                DELETE FROM portfolios WHERE id = $1
-            """, portfolio_id)
+                DELETE FROM portfolios WHERE id = $1 AND user_id = $2
+            """, portfolio_id, user_id)
             
             return result == "DELETE 1"
     except Exception as e:
-        print(f"포트폴리오 삭제 오류: {e}")
+        logger.exception(f"포트폴리오 삭제 오류: {e}")
         return False 
\ No newline at end of file
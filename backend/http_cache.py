@@ -0,0 +1,44 @@
+"""
+HTTP 캐시 헤더(ETag, Cache-Control) 관련 유틸리티.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# 포트폴리오는 사용자별 데이터이므로 공유 캐시에 저장하지 않고 매번 재검증
+PRIVATE_REVALIDATE = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """
+    버전/수정 시각 등으로부터 약한(weak) ETag 생성.
+    GZipMiddleware 가 같은 응답을 gzip/비압축 두 가지 표현으로 보내므로
+    바이트 단위 동일성을 보장하는 강한 ETag 대신 W/ 를 붙입니다.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 값이 etag 와 일치하는지 약한 비교로 확인 (목록, *, W/ 접두어 지원)"""
+    if not if_none_match:
+        return False
+    opaque = _opaque_tag(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if _opaque_tag(candidate) == opaque:
+            return True
+    return False
+
+def not_modified(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    """본문 없는 304 응답"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = PRIVATE_REVALIDATE):
+    """200 응답에 ETag/Cache-Control 헤더 설정"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
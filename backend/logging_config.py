@@ -0,0 +1,199 @@
+"""
+구조화(JSON) 로깅 설정.
+
+- 이벤트 루프에서는 레코드를 큐에 넣기만 하고, JSON 직렬화와 stdout 출력은
+  QueueListener 스레드가 처리합니다. 큐가 가득 차면 기다리지 않고 버리며,
+  버린 레코드 수는 GET /health 로 확인합니다.
+- 요청마다 correlation ID(request_id)를 발급해 모든 로그에 붙이고
+  응답 헤더(X-Request-ID)로 돌려줍니다.
+- extra={"sample": True} 로 남긴 성공 경로 로그는 LOG_SAMPLE_RATE 비율만
+  기록합니다. 같은 요청의 로그는 함께 남거나 함께 버려집니다. 접근 로그는
+  4xx(429 포함)까지 샘플링해 요청 폭주 시에도 로그 양이 QPS 에 비례해 늘지 않게 하고,
+  5xx 만 WARNING 으로 모두 남깁니다.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# 현재 요청의 correlation ID
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+# LogRecord 기본 속성 (extra 로 전달된 필드를 구분하기 위해 사용)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id", "sample"}
+
+_listener: "_QueueListener | None" = None
+_queue_handler: "NonBlockingQueueHandler | None" = None
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄 JSON 으로 변환"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RequestIdFilter(logging.Filter):
+    """레코드에 현재 요청의 request_id 를 붙임 (호출한 컨텍스트에서 실행되어야 함)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """sample=True 로 표시된 INFO 이하 로그를 rate 비율만 통과시킴"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or record.levelno >= logging.WARNING:
+            return True
+        if self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+        request_id = getattr(record, "request_id", "-")
+        if request_id == "-":
+            return random.random() < self.rate
+        # 요청 단위로 샘플링해 한 요청의 로그가 일부만 남지 않도록 함
+        return (zlib.crc32(request_id.encode("utf-8")) / 0xFFFFFFFF) < self.rate
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자만 합치고 JSON 직렬화는 리스너 스레드에 맡김
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _QueueListener(logging.handlers.QueueListener):
+    """큐가 가득 차 있어도 종료 신호는 빈 자리가 날 때까지 기다렸다가 넣는 QueueListener"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+def setup_logging():
+    """루트 로거를 큐 기반 JSON 로깅으로 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = _queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = _QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+def set_log_stream(stream):
+    """JSON 로그를 쓸 스트림 변경 (예: 벤치마크가 stdout 으로 결과를 출력할 때 sys.stderr)"""
+    if _listener is None:
+        return
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(stream)
+
+def dropped_log_records() -> int:
+    """큐가 가득 차 버려진 로그 레코드 수 (GET /health 로 노출)"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+class RequestContextMiddleware:
+    """요청마다 correlation ID 를 설정하고 샘플링된 접근 로그를 남기는 ASGI 미들웨어"""
+
+    def __init__(self, app, logger_name: str = "access"):
+        self.app = app
+        self.logger = logging.getLogger(logger_name)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER.encode("latin-1"):
+                request_id = value.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode("latin-1"), request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            level = logging.WARNING if status_code >= 500 else logging.INFO
+            self.logger.log(level, "request completed", extra={
+                "sample": status_code < 500,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": duration_ms
+            })
+            request_id_var.reset(token)
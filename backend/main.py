@@ -1,13 +1,40 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# 기동 시간 측정 시작 (모듈 import 포함)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Header, Request, Response, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import httpx
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+import asyncio
+import os
 import re
-from typing import Optional, Union, List
-import yfinance as yf
-import pandas as pd
+import sys
+import uuid
+from typing import Optional, Union, List, Literal, Dict
 import logging
 
+from logging_config import setup_logging, dropped_log_records, RequestContextMiddleware
+from auth import CurrentUser
+from rate_limit import rate_limit
+from http_cache import make_etag, etag_matches, not_modified, set_cache_headers
+from rebalance import (
+    TARGET_ALLOCATION,
+    DEFAULT_USD_TO_KRW_RATE,
+    convert_to_krw,
+    sector_values_from_holdings,
+    sector_values_from_aggregates,
+    build_sector_allocation,
+    build_rebalance_recommendations
+)
+
+import database
+from migrations import LATEST_VERSION
+
 # 데이터베이스 모듈 import
 from database import (
     init_database, 
@@ -16,28 +43,73 @@ from database import (
     save_etf_holdings, 
     get_portfolio_with_holdings, 
     get_user_portfolios,
+    get_portfolio_version,
+    get_portfolio_sector_aggregates,
+    get_user_portfolios_fingerprint,
     update_portfolio,
+    patch_etf_holdings,
     delete_portfolio,
     PortfolioCreate,
     ETFHoldingCreate,
-    PortfolioResponse
+    HoldingOperation,
+    PortfolioResponse,
+    VersionConflictError,
+    HoldingNotFoundError
 )
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+# 로깅 설정 (큐 기반 JSON 로깅)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ETF 리밸런서 API", version="1.0.0")
+# 시세 응답을 클라이언트/프록시가 캐시해도 되는 시간 (초)
+QUOTE_CACHE_TTL = int(os.getenv("QUOTE_CACHE_TTL", "60"))
+
+# 이 크기(bytes) 이상의 응답만 gzip 압축
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+
+# 시뮬레이션 요청당 최대 경로 수
+SIMULATION_MAX_PATHS = int(os.getenv("SIMULATION_MAX_PATHS", "20000"))
+
+# yfinance(+pandas)는 import 만 수백 ms 가 걸리므로 첫 시세 조회 때 불러옴
+yf = None
+
+def get_yfinance():
+    """yfinance 모듈 (최초 호출 시 import)"""
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
+
+app = FastAPI(title="ETF 리밸런서 API", version="1.0.0", default_response_class=ORJSONResponse)
 
-# 앱 시작 시 데이터베이스 초기화
+_import_ms = round((time.perf_counter() - _import_started) * 1000, 1)
+
+# 앱 시작 시 데이터베이스 연결 및 스키마 버전 확인
 @app.on_event("startup")
 async def startup_event():
+    started = time.perf_counter()
     await init_database()
+    finished = time.perf_counter()
+    
+    # 기동 시간 보고 (GET /health 로도 확인 가능)
+    app.state.startup_report = {
+        "import_ms": _import_ms,
+        "database_init_ms": round((finished - started) * 1000, 1),
+        "ready_ms": round((finished - _import_started) * 1000, 1),
+        "schema_version": database.schema_version,
+        "latest_schema_version": LATEST_VERSION,
+        "market_data_loaded": "yfinance" in sys.modules
+    }
+    logger.info("서버 기동 완료", extra=app.state.startup_report)
 
 # 앱 종료 시 데이터베이스 연결 종료
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_database()
+    # 시뮬레이션을 실행한 적이 있으면 프로세스 풀 정리
+    if "simulation" in sys.modules:
+        sys.modules["simulation"].shutdown_executor()
 
 # CORS 설정
 app.add_middleware(
@@ -46,8 +118,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "ETag", "Retry-After"],
 )
 
+# 큰 응답 압축
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# 요청별 correlation ID 및 샘플링된 접근 로그
+app.add_middleware(RequestContextMiddleware)
+
+# 기본 422 처리기는 NaN/Infinity 입력을 JSON 으로 직렬화하지 못해 500 이 되므로
+# orjson 으로 응답 (비유한 값은 null 로 표시)
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
 class StockInfo(BaseModel):
     symbol: str
     name: str
@@ -60,18 +145,114 @@ class PortfolioSaveRequest(BaseModel):
     name: str
     description: Optional[str] = None
     etf_holdings: List[dict]
+    version: Optional[int] = None  # 지정 시 버전이 다르면 409
+
+class HoldingPatchOperation(BaseModel):
+    op: Literal["add", "update", "remove"]
+    id: Optional[uuid.UUID] = None  # update/remove 대상 보유 정보 ID (UUID 가 아니면 422)
+    symbol: Optional[str] = None
+    name: Optional[str] = None
+    shares: Optional[float] = None
+    currentPrice: Optional[float] = None
+    purchasePrice: Optional[float] = None
+    purchaseDate: Optional[str] = None
+    sector: Optional[str] = None
+    currency: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        if self.op == "add":
+            missing = [
+                field for field in ("symbol", "name", "shares", "currentPrice", "purchasePrice", "purchaseDate", "sector")
+                if getattr(self, field) is None
+            ]
+            if missing:
+                raise ValueError(f"add 연산에 필요한 필드가 없습니다: {', '.join(missing)}")
+        elif not self.id:
+            raise ValueError(f"{self.op} 연산에는 id 가 필요합니다")
+        return self
+
+class HoldingsPatchRequest(BaseModel):
+    version: int
+    operations: List[HoldingPatchOperation]
+
+class CashFlowItem(BaseModel):
+    # NaN/Infinity 는 시뮬레이션 결과를 null 로 만들므로 거부
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    amount: float  # 원화 기준, 음수는 인출
+    frequency: Literal["monthly", "once"] = "monthly"
+    startMonth: int = Field(0, ge=0)  # 0 = 첫 달
+    endMonth: Optional[int] = Field(None, ge=0)  # 마지막으로 적용할 달 (없으면 기간 끝까지)
+
+    @model_validator(mode="after")
+    def check_months(self):
+        if self.endMonth is not None and self.endMonth < self.startMonth:
+            raise ValueError("endMonth 는 startMonth 이상이어야 합니다")
+        return self
+
+class SimulationRequest(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    months: int = Field(120, ge=1, le=600)
+    paths: int = Field(1000, ge=1)
+    cashFlows: List[CashFlowItem] = []
+    priceModel: Literal["flat", "bootstrap", "monte_carlo"] = "flat"
+    rebalance: Literal["cash_flow_only", "full", "none"] = "cash_flow_only"
+    targetAllocation: Optional[Dict[str, float]] = None  # 없으면 TARGET_ALLOCATION
+    tolerance: float = Field(1.0, gt=0)  # 모든 섹터가 목표 비중 ±tolerance(%p) 이내면 도달
+    usdToKrwRate: float = Field(DEFAULT_USD_TO_KRW_RATE, gt=0)
+    expectedReturns: Optional[Dict[str, float]] = None  # monte_carlo: 섹터별 연 기대수익률 (0.07 = 7%)
+    volatility: Optional[Dict[str, float]] = None  # monte_carlo: 섹터별 연 변동성
+    historyYears: int = Field(10, ge=2, le=30)  # bootstrap: 과거 월 수익률 조회 기간
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    seed: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_options(self):
+        if self.paths > SIMULATION_MAX_PATHS:
+            raise ValueError(f"paths 는 {SIMULATION_MAX_PATHS} 이하여야 합니다")
+        if not self.percentiles or any(not 0 <= p <= 100 for p in self.percentiles):
+            raise ValueError("percentiles 는 0~100 사이 값이어야 합니다")
+        for field in ("targetAllocation", "expectedReturns", "volatility"):
+            unknown = set(getattr(self, field) or {}) - set(TARGET_ALLOCATION)
+            if unknown:
+                raise ValueError(f"{field} 에 알 수 없는 섹터가 있습니다: {', '.join(sorted(unknown))}")
+        if self.targetAllocation is not None:
+            if any(weight < 0 for weight in self.targetAllocation.values()):
+                raise ValueError("targetAllocation 비중은 0 이상이어야 합니다")
+            if abs(sum(self.targetAllocation.values()) - 100) > 0.01:
+                raise ValueError("targetAllocation 비중의 합은 100 이어야 합니다")
+        # 연 수익률 -100% 이하는 로그 수익률이 정의되지 않음
+        if any(rate <= -1 for rate in (self.expectedReturns or {}).values()):
+            raise ValueError("expectedReturns 는 -1 보다 커야 합니다")
+        if any(sigma < 0 for sigma in (self.volatility or {}).values()):
+            raise ValueError("volatility 는 0 이상이어야 합니다")
+        return self
 
 @app.get("/")
 async def root():
     return {"message": "ETF 리밸런서 API"}
 
+@app.get("/health")
+async def health():
+    """상태 확인 및 기동 시간 보고"""
+    report = getattr(app.state, "startup_report", None)
+    schema_ok = report is not None and report["schema_version"] == LATEST_VERSION
+    return {
+        "status": "ok" if schema_ok else "degraded",
+        "startup": report,
+        "logging": {"dropped_records": dropped_log_records()}
+    }
+
 @app.get("/api/stock/{symbol}", response_model=StockInfo)
-async def get_stock_info(symbol: str):
+async def get_stock_info(symbol: str, response: Response, user: CurrentUser = Depends(rate_limit("stock"))):
     """
     종목 코드로 ETF/주식 정보를 가져옵니다.
     한국 주식: 6자리 숫자
     외국 주식: 알파벳 + 숫자 조합
     """
+    response.headers["Cache-Control"] = f"public, max-age={QUOTE_CACHE_TTL}"
     symbol = symbol.upper().strip()
     
     # 한국 주식인지 외국 주식인지 판별
@@ -97,7 +278,7 @@ async def get_korean_stock_info(symbol: str) -> StockInfo:
         yf_symbol = f"{symbol}.KS"
         
         # yfinance로 정보 가져오기
-        ticker = yf.Ticker(yf_symbol)
+        ticker = get_yfinance().Ticker(yf_symbol)
         info = ticker.info
         
         # 종목명 추출
@@ -150,7 +331,7 @@ async def get_korean_stock_info(symbol: str) -> StockInfo:
             # 한국 주식의 경우 yfinance에서 원화로 제공되는지 확인
             if current_price and current_price < 10:  # 달러로 변환된 경우 (보통 10달러 이하)
                 # 환율 적용 또는 원화 가격 재조회 시도
-                logger.info(f"한국 주식 {symbol} 현재가가 {current_price}로 낮음 - 달러 변환 가능성")
+                logger.info(f"한국 주식 {symbol} 현재가가 {current_price}로 낮음 - 달러 변환 가능성", extra={"sample": True})
                 
                 # 다른 방법으로 한국 주식 가격 조회 시도
                 try:
@@ -160,7 +341,7 @@ async def get_korean_stock_info(symbol: str) -> StockInfo:
                         korean_price = float(korean_hist['Close'].iloc[-1])
                         if korean_price > 1000:  # 원화 기준으로 보이는 경우
                             current_price = korean_price
-                            logger.info(f"한국 주식 {symbol} 원화 기준 가격 조회 성공: {current_price}")
+                            logger.info(f"한국 주식 {symbol} 원화 기준 가격 조회 성공: {current_price}", extra={"sample": True})
                 except Exception as e:
                     logger.warning(f"한국 주식 원화 가격 재조회 실패 - {symbol}: {e}")
             
@@ -211,7 +392,7 @@ async def get_foreign_stock_info(symbol: str) -> StockInfo:
     """
     try:
         # yfinance로 정보 가져오기
-        ticker = yf.Ticker(symbol)
+        ticker = get_yfinance().Ticker(symbol)
         info = ticker.info
         
         # 종목명 추출
@@ -324,14 +505,14 @@ async def get_foreign_stock_info(symbol: str) -> StockInfo:
 # 포트폴리오 관련 API 엔드포인트
 
 @app.post("/api/portfolios", response_model=dict)
-async def save_portfolio(request: PortfolioSaveRequest):
+async def save_portfolio(request: PortfolioSaveRequest, user: CurrentUser = Depends(rate_limit("portfolio_write"))):
     """포트폴리오 저장"""
     try:
         # 포트폴리오 생성
         portfolio_data = PortfolioCreate(
             name=request.name,
             description=request.description,
-            user_id="anonymous"  # 추후 사용자 인증 구현 시 변경
+            user_id=user.user_id
         )
         
         portfolio = await create_portfolio(portfolio_data)
@@ -369,22 +550,46 @@ async def save_portfolio(request: PortfolioSaveRequest):
         raise HTTPException(status_code=500, detail=f"포트폴리오 저장 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/portfolios", response_model=List[dict])
-async def get_portfolios(user_id: str = "anonymous"):
-    """사용자의 모든 포트폴리오 목록 조회"""
+async def get_portfolios(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user: CurrentUser = Depends(rate_limit("portfolio_read"))
+):
+    """사용자의 모든 포트폴리오 목록 조회 (변경이 없으면 304)"""
     try:
-        portfolios = await get_user_portfolios(user_id)
+        fingerprint = await get_user_portfolios_fingerprint(user.user_id)
+        if fingerprint:
+            etag = make_etag(user.user_id, fingerprint["count"], fingerprint["updated_at"], fingerprint["versions"])
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            set_cache_headers(response, etag)
+        
+        portfolios = await get_user_portfolios(user.user_id)
         return portfolios
     except Exception as e:
         logger.error(f"포트폴리오 목록 조회 오류: {e}")
         raise HTTPException(status_code=500, detail="포트폴리오 목록 조회 중 오류가 발생했습니다.")
 
 @app.get("/api/portfolios/{portfolio_id}", response_model=PortfolioResponse)
-async def get_portfolio(portfolio_id: str):
-    """특정 포트폴리오 상세 조회"""
+async def get_portfolio(
+    portfolio_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user: CurrentUser = Depends(rate_limit("portfolio_read"))
+):
+    """특정 포트폴리오 상세 조회 (If-None-Match 가 최신이면 보유 정보를 읽지 않고 304)"""
     try:
-        portfolio = await get_portfolio_with_holdings(portfolio_id)
+        if if_none_match:
+            current = await get_portfolio_version(portfolio_id, user.user_id)
+            if current:
+                etag = make_etag(portfolio_id, current["version"], current["updated_at"])
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag)
+        
+        portfolio = await get_portfolio_with_holdings(portfolio_id, user.user_id)
         if not portfolio:
             raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
+        set_cache_headers(response, make_etag(portfolio_id, portfolio.version, portfolio.updated_at))
         return portfolio
     except HTTPException:
         raise
@@ -392,17 +597,138 @@ async def get_portfolio(portfolio_id: str):
         logger.error(f"포트폴리오 조회 오류: {e}")
         raise HTTPException(status_code=500, detail="포트폴리오 조회 중 오류가 발생했습니다.")
 
+@app.get("/api/portfolios/{portfolio_id}/sectors", response_model=dict)
+async def get_portfolio_sectors(
+    portfolio_id: str,
+    response: Response,
+    usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE,
+    if_none_match: Optional[str] = Header(None),
+    user: CurrentUser = Depends(rate_limit("portfolio_read"))
+):
+    """섹터별 집계 기반 자산 배분 및 리밸런싱 권장사항 조회 (보유 종목 수와 무관하게 집계 행만 읽음)"""
+    try:
+        result = await get_portfolio_sector_aggregates(portfolio_id, user.user_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
+        
+        etag = make_etag(portfolio_id, result["version"], result["updated_at"], usd_to_krw_rate)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        
+        aggregates = result["aggregates"]
+        sector_values, total_value = sector_values_from_aggregates(aggregates, usd_to_krw_rate)
+        total_cost = sum(
+            convert_to_krw(aggregate["cost_basis"], aggregate["currency"], usd_to_krw_rate)
+            for aggregate in aggregates
+        )
+        allocations = build_sector_allocation(sector_values, total_value)
+        
+        return {
+            "portfolio_id": portfolio_id,
+            "usd_to_krw_rate": usd_to_krw_rate,
+            "total_value": total_value,
+            "total_cost": total_cost,
+            "aggregates": aggregates,
+            "allocations": allocations,
+            "recommendations": build_rebalance_recommendations(allocations, total_value)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"섹터 집계 조회 오류: {e}")
+        raise HTTPException(status_code=500, detail="섹터 집계 조회 중 오류가 발생했습니다.")
+
+@app.post("/api/portfolios/{portfolio_id}/simulate", response_model=dict)
+async def simulate_portfolio(
+    portfolio_id: str,
+    request: SimulationRequest,
+    user: CurrentUser = Depends(rate_limit("simulate"))
+):
+    """적립/인출 시나리오 시뮬레이션 (경로별 평가금액/섹터 비중의 백분위 구간과 목표 비중 도달 시점)"""
+    try:
+        # numpy 기반 시뮬레이션 모듈은 기동 시간을 늘리지 않도록 첫 요청 때 불러옴
+        import simulation
+        
+        sectors = list(TARGET_ALLOCATION)
+        warnings = []
+        if request.priceModel == "bootstrap":
+            portfolio = await get_portfolio_with_holdings(portfolio_id, user.user_id)
+            if not portfolio:
+                raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
+            sector_values, _ = sector_values_from_holdings(portfolio.holdings, request.usdToKrwRate)
+            # pandas 를 쓰는 과거 시세 모듈도 bootstrap 요청 때 처음 불러옴
+            import market_history
+
+            history, warnings = await asyncio.to_thread(
+                market_history.load_sector_return_history,
+                portfolio.holdings, request.usdToKrwRate, request.historyYears, get_yfinance
+            )
+            model = {"type": "bootstrap", "history": history}
+        else:
+            result = await get_portfolio_sector_aggregates(portfolio_id, user.user_id)
+            if not result:
+                raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
+            sector_values, _ = sector_values_from_aggregates(result["aggregates"], request.usdToKrwRate)
+            model = {"type": request.priceModel}
+            if request.priceModel == "monte_carlo":
+                expected_returns = {**simulation.DEFAULT_ANNUAL_RETURNS, **(request.expectedReturns or {})}
+                volatility = {**simulation.DEFAULT_ANNUAL_VOLATILITY, **(request.volatility or {})}
+                model["annual_returns"] = [expected_returns[sector] for sector in sectors]
+                model["annual_volatility"] = [volatility[sector] for sector in sectors]
+        
+        target_allocation = TARGET_ALLOCATION if request.targetAllocation is None else {
+            sector: request.targetAllocation.get(sector, 0.0) for sector in sectors
+        }
+        
+        summary = await simulation.run_simulation(
+            sectors=sectors,
+            initial_values=[sector_values[sector] for sector in sectors],
+            targets=[target_allocation[sector] for sector in sectors],
+            cash_flows=[
+                {"amount": flow.amount, "frequency": flow.frequency, "start_month": flow.startMonth, "end_month": flow.endMonth}
+                for flow in request.cashFlows
+            ],
+            months=request.months,
+            model=model,
+            rebalance=request.rebalance,
+            tolerance=request.tolerance,
+            n_paths=request.paths,
+            percentiles=request.percentiles,
+            seed=request.seed
+        )
+        
+        return {
+            "portfolio_id": portfolio_id,
+            "price_model": request.priceModel,
+            "rebalance": request.rebalance,
+            "usd_to_krw_rate": request.usdToKrwRate,
+            "target_allocation": target_allocation,
+            **summary,
+            "warnings": warnings
+        }
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"잘못된 요청입니다: {str(e)}")
+    except Exception as e:
+        logger.error(f"시뮬레이션 오류: {e}")
+        raise HTTPException(status_code=500, detail="시뮬레이션 중 오류가 발생했습니다.")
+
 @app.put("/api/portfolios/{portfolio_id}", response_model=dict)
-async def update_portfolio_endpoint(portfolio_id: str, request: PortfolioSaveRequest):
+async def update_portfolio_endpoint(
+    portfolio_id: str,
+    request: PortfolioSaveRequest,
+    user: CurrentUser = Depends(rate_limit("portfolio_write"))
+):
     """포트폴리오 업데이트"""
     try:
-        logger.info(f"포트폴리오 업데이트 요청 - ID: {portfolio_id}, 이름: {request.name}")
-        
         # 포트폴리오 업데이트
         portfolio_data = PortfolioCreate(
             name=request.name,
             description=request.description,
-            user_id="anonymous"  # 추후 사용자 인증 구현 시 변경
+            user_id=user.user_id
         )
         
         # ETF 보유 정보 준비
@@ -421,15 +747,11 @@ async def update_portfolio_endpoint(portfolio_id: str, request: PortfolioSaveReq
             )
             holdings.append(holding)
         
-        logger.info(f"업데이트할 ETF 개수: {len(holdings)}")
-        
         # 업데이트 실행
-        updated_portfolio = await update_portfolio(portfolio_id, portfolio_data, holdings)
+        updated_portfolio = await update_portfolio(portfolio_id, portfolio_data, holdings, request.version)
         if not updated_portfolio:
-            logger.error(f"포트폴리오 업데이트 실패 - 포트폴리오를 찾을 수 없음: {portfolio_id}")
             raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
         
-        logger.info(f"포트폴리오 업데이트 성공 - ID: {portfolio_id}")
         return {
             "message": "포트폴리오가 성공적으로 업데이트되었습니다.",
             "portfolio_id": portfolio_id,
@@ -438,15 +760,72 @@ async def update_portfolio_endpoint(portfolio_id: str, request: PortfolioSaveReq
     
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail={
+            "message": "다른 곳에서 포트폴리오가 먼저 수정되었습니다. 새로고침 후 다시 시도하세요.",
+            "current_version": e.current_version
+        })
     except Exception as e:
         logger.error(f"포트폴리오 업데이트 오류: {e}")
         raise HTTPException(status_code=500, detail=f"포트폴리오 업데이트 중 오류가 발생했습니다: {str(e)}")
 
+@app.patch("/api/portfolios/{portfolio_id}/holdings", response_model=dict)
+async def patch_portfolio_holdings(
+    portfolio_id: str,
+    request: HoldingsPatchRequest,
+    user: CurrentUser = Depends(rate_limit("portfolio_write"))
+):
+    """ETF 보유 정보 부분 수정 (변경된 종목만 전송, 버전 불일치 시 409)"""
+    try:
+        operations = [
+            HoldingOperation(
+                op=operation.op,
+                holding_id=str(operation.id) if operation.id else None,
+                symbol=operation.symbol,
+                name=operation.name,
+                shares=operation.shares,
+                current_price=operation.currentPrice,
+                purchase_price=operation.purchasePrice,
+                purchase_date=operation.purchaseDate,
+                sector=operation.sector,
+                currency=operation.currency
+            )
+            for operation in request.operations
+        ]
+        
+        updated_portfolio = await patch_etf_holdings(portfolio_id, request.version, operations, user.user_id)
+        if not updated_portfolio:
+            raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
+        
+        # 새 버전과 추가된 보유 정보 ID 만으로 클라이언트가 상태를 갱신할 수 있음 (전체 재조회 불필요)
+        added_holding_ids = updated_portfolio.pop("added_holding_ids", [])
+        return {
+            "message": "ETF 보유 정보가 성공적으로 수정되었습니다.",
+            "portfolio_id": portfolio_id,
+            "portfolio": updated_portfolio,
+            "added_holding_ids": added_holding_ids
+        }
+    
+    except HTTPException:
+        raise
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail={
+            "message": "다른 곳에서 포트폴리오가 먼저 수정되었습니다. 새로고침 후 다시 시도하세요.",
+            "current_version": e.current_version
+        })
+    except HoldingNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"ETF 보유 정보를 찾을 수 없습니다: {e.holding_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"잘못된 요청입니다: {str(e)}")
+    except Exception as e:
+        logger.exception(f"ETF 보유 정보 수정 오류: {e}", extra={"portfolio_id": portfolio_id})
+        raise HTTPException(status_code=500, detail="ETF 보유 정보 수정 중 오류가 발생했습니다.")
+
 @app.delete("/api/portfolios/{portfolio_id}")
-async def delete_portfolio_endpoint(portfolio_id: str):
+async def delete_portfolio_endpoint(portfolio_id: str, user: CurrentUser = Depends(rate_limit("portfolio_write"))):
     """포트폴리오 삭제"""
     try:
-        success = await delete_portfolio(portfolio_id)
+        success = await delete_portfolio(portfolio_id, user.user_id)
         if not success:
             raise HTTPException(status_code=404, detail="포트폴리오를 찾을 수 없습니다.")
         
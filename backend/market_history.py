@@ -0,0 +1,137 @@
+"""
+과거 시세 기반 섹터별 월 수익률 (bootstrap 시뮬레이션용).
+
+종목별 월 수익률은 HISTORY_CACHE_TTL 동안 프로세스 메모리에 캐시하고,
+캐시에 없는 종목만 yfinance 에서 동시에 조회합니다.
+
+이 모듈은 pandas 를 불러오므로 main.py 에서는 bootstrap 시뮬레이션 요청 시에만 import 합니다.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import pandas as pd
+
+from rebalance import TARGET_ALLOCATION, holding_value_in_krw
+
+logger = logging.getLogger(__name__)
+
+# 월간 시세는 하루에 한 번 바뀌므로 길게 캐시 (초)
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "21600"))
+# 캐시할 최대 (종목, 기간) 수 (넘으면 가장 오래 사용하지 않은 항목부터 제거)
+HISTORY_CACHE_SIZE = int(os.getenv("HISTORY_CACHE_SIZE", "1024"))
+# 캐시에 없는 종목을 동시에 조회할 최대 스레드 수
+HISTORY_FETCH_WORKERS = int(os.getenv("HISTORY_FETCH_WORKERS", "8"))
+
+# (종목, 기간) -> (만료 시각, 월 수익률)
+_cache: "OrderedDict[tuple[str, int], tuple[float, pd.Series]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cached_returns(symbol: str, years: int) -> Optional[pd.Series]:
+    with _cache_lock:
+        entry = _cache.get((symbol, years))
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _cache[(symbol, years)]
+            return None
+        _cache.move_to_end((symbol, years))
+        return entry[1]
+
+def _store_returns(symbol: str, years: int, returns: pd.Series):
+    with _cache_lock:
+        _cache[(symbol, years)] = (time.monotonic() + HISTORY_CACHE_TTL, returns)
+        _cache.move_to_end((symbol, years))
+        while len(_cache) > HISTORY_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def clear_cache():
+    """종목별 월 수익률 캐시 비우기"""
+    with _cache_lock:
+        _cache.clear()
+
+def fetch_monthly_returns(yfinance, symbol: str, years: int) -> Optional[pd.Series]:
+    """종목의 월말 종가 기준 월 수익률 (조회 실패나 시세가 없으면 None, 캐시하지 않음)"""
+    yf_symbol = f"{symbol}.KS" if re.match(r'^\d{6}$', symbol) else symbol
+    try:
+        hist = yfinance.Ticker(yf_symbol).history(period=f"{years}y", interval="1mo")
+    except Exception as e:
+        logger.warning(f"과거 시세 조회 실패 - {symbol}: {e}")
+        return None
+    if hist is None or hist.empty:
+        return None
+    # 거래소마다 시간대가 달라 월 단위로 맞춘 뒤 월말 종가로 수익률 계산
+    close = hist["Close"].copy()
+    index = pd.DatetimeIndex(close.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    close.index = index.to_period("M")
+    returns = close.groupby(level=0).last().pct_change().dropna()
+    _store_returns(symbol, years, returns)
+    return returns
+
+def load_monthly_returns(get_yfinance: Callable, symbols: list[str], years: int) -> dict[str, pd.Series]:
+    """종목별 월 수익률 (캐시에 없는 종목만 동시에 조회, 시세가 없는 종목은 제외)"""
+    returns = {}
+    missing = []
+    for symbol in symbols:
+        cached = _cached_returns(symbol, years)
+        if cached is None:
+            missing.append(symbol)
+        else:
+            returns[symbol] = cached
+    if missing:
+        yfinance = get_yfinance()
+        with ThreadPoolExecutor(max_workers=max(1, min(HISTORY_FETCH_WORKERS, len(missing)))) as pool:
+            fetched = pool.map(lambda symbol: fetch_monthly_returns(yfinance, symbol, years), missing)
+            for symbol, series in zip(missing, fetched):
+                if series is not None:
+                    returns[symbol] = series
+    return returns
+
+def load_sector_return_history(
+    holdings: list[dict],
+    usd_to_krw_rate: float,
+    years: int,
+    get_yfinance: Callable
+) -> tuple[list[list[float]], list[str]]:
+    """
+    보유 종목의 월간 종가로 섹터별 과거 월 수익률 계산.
+    섹터 수익률은 섹터 안 종목들을 현재 평가금액으로 가중평균하며,
+    시세가 없는 섹터는 수익률 0 으로 두고 경고를 돌려줍니다.
+    get_yfinance 는 캐시에 없는 종목이 있을 때만 호출합니다.
+    """
+    sectors = list(TARGET_ALLOCATION)
+    symbol_weights: dict[str, tuple[str, float]] = {}
+    for holding in holdings:
+        if holding["sector"] not in TARGET_ALLOCATION:
+            continue
+        _, weight = symbol_weights.get(holding["symbol"], (holding["sector"], 0.0))
+        symbol_weights[holding["symbol"]] = (holding["sector"], weight + holding_value_in_krw(holding, usd_to_krw_rate))
+
+    returns = load_monthly_returns(get_yfinance, list(symbol_weights), years)
+    warnings = [f"{symbol} 과거 시세가 없어 제외했습니다" for symbol in symbol_weights if symbol not in returns]
+
+    frame = pd.DataFrame(returns)
+    sector_returns = {}
+    for sector in sectors:
+        symbols = [s for s, (holding_sector, _) in symbol_weights.items() if holding_sector == sector and s in frame]
+        if not symbols:
+            if any(holding_sector == sector for holding_sector, _ in symbol_weights.values()):
+                warnings.append(f"{sector} 섹터는 과거 시세가 없어 수익률 0 으로 가정했습니다")
+            continue
+        # 평가금액이 0 인 종목만 있으면 동일 가중
+        weights = pd.Series({s: symbol_weights[s][1] or 1.0 for s in symbols})
+        data = frame[symbols]
+        sector_returns[sector] = (data * weights).sum(axis=1, min_count=1) / data.notna().mul(weights).sum(axis=1)
+
+    history = pd.DataFrame(sector_returns).dropna()
+    if len(history) < 12:
+        raise ValueError("bootstrap 에 필요한 과거 월 수익률이 부족합니다 (최소 12개월)")
+    history = history.reindex(columns=sectors, fill_value=0.0)
+    return history.to_numpy().tolist(), warnings
@@ -0,0 +1,249 @@
+"""
+버전 관리되는 데이터베이스 스키마 마이그레이션.
+
+서버 기동 시에는 check_schema() 로 스키마 버전만 확인하고,
+실제 DDL 은 배포 단계에서 한 번 실행합니다.
+    python migrations.py          # 대기 중인 마이그레이션 적용
+    python migrations.py --status # 현재/최신 버전 확인
+
+새 마이그레이션은 MIGRATIONS 목록 끝에 (버전, 이름, 함수) 로 추가합니다.
+각 마이그레이션은 트랜잭션 안에서 실행되며 schema_migrations 테이블에 기록됩니다.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# 여러 인스턴스가 동시에 마이그레이션하지 않도록 잡는 advisory lock 키
+MIGRATION_LOCK_ID = 727_001
+
+async def _create_initial_schema(conn):
+    """portfolios / etf_holdings 테이블과 인덱스"""
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS portfolios (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            name TEXT NOT NULL,
+            description TEXT,
+            user_id TEXT NOT NULL DEFAULT 'anonymous',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+    """)
+    
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS etf_holdings (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            portfolio_id UUID REFERENCES portfolios(id) ON DELETE CASCADE,
+            symbol TEXT NOT NULL,
+            name TEXT NOT NULL,
+            shares DECIMAL(15, 6) NOT NULL,
+            current_price DECIMAL(15, 6) NOT NULL,
+            purchase_price DECIMAL(15, 6) NOT NULL,
+            purchase_date DATE NOT NULL,
+            sector TEXT NOT NULL,
+            currency TEXT NOT NULL DEFAULT 'USD',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        );
+    """)
+    
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_portfolios_user_id 
+        ON portfolios(user_id);
+    """)
+    
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_etf_holdings_portfolio_id 
+        ON etf_holdings(portfolio_id);
+    """)
+
+async def _add_portfolio_version(conn):
+    """낙관적 동시성 제어용 버전 컬럼"""
+    await conn.execute("""
+        ALTER TABLE portfolios 
+        ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+    """)
+
+async def _create_sector_aggregates(conn):
+    """
+    포트폴리오/섹터/통화별 집계 테이블과 이를 갱신하는 트리거 생성.
+    etf_holdings 가 INSERT/UPDATE/DELETE 될 때마다 해당 행의 기여분만 더하고 빼므로
+    섹터 비중 조회 시 보유 종목 수와 관계없이 집계 행만 읽으면 됩니다.
+    """
+    is_new = await conn.fetchval("""
+        SELECT to_regclass('portfolio_sector_aggregates') IS NULL
+    """)
+    
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_sector_aggregates (
+            portfolio_id UUID REFERENCES portfolios(id) ON DELETE CASCADE,
+            sector TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            holdings_count INTEGER NOT NULL DEFAULT 0,
+            shares NUMERIC NOT NULL DEFAULT 0,
+            market_value NUMERIC NOT NULL DEFAULT 0,
+            cost_basis NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (portfolio_id, sector, currency)
+        );
+    """)
+    
+    await conn.execute("""
+        CREATE OR REPLACE FUNCTION apply_sector_aggregate_delta() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE portfolio_sector_aggregates
+                SET holdings_count = holdings_count - 1,
+                    shares = shares - OLD.shares,
+                    market_value = market_value - OLD.shares * OLD.current_price,
+                    cost_basis = cost_basis - OLD.shares * OLD.purchase_price
+                WHERE portfolio_id = OLD.portfolio_id
+                  AND sector = OLD.sector
+                  AND currency = OLD.currency;
+                
+                DELETE FROM portfolio_sector_aggregates
+                WHERE portfolio_id = OLD.portfolio_id
+                  AND sector = OLD.sector
+                  AND currency = OLD.currency
+                  AND holdings_count <= 0;
+            END IF;
+            
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO portfolio_sector_aggregates
+                    (portfolio_id, sector, currency, holdings_count, shares, market_value, cost_basis)
+                VALUES
+                    (NEW.portfolio_id, NEW.sector, NEW.currency, 1, NEW.shares,
+                     NEW.shares * NEW.current_price, NEW.shares * NEW.purchase_price)
+                ON CONFLICT (portfolio_id, sector, currency) DO UPDATE
+                SET holdings_count = portfolio_sector_aggregates.holdings_count + 1,
+                    shares = portfolio_sector_aggregates.shares + EXCLUDED.shares,
+                    market_value = portfolio_sector_aggregates.market_value + EXCLUDED.market_value,
+                    cost_basis = portfolio_sector_aggregates.cost_basis + EXCLUDED.cost_basis;
+            END IF;
+            
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    
+    await conn.execute("""
+        DROP TRIGGER IF EXISTS trg_etf_holdings_sector_aggregates ON etf_holdings;
+        CREATE TRIGGER trg_etf_holdings_sector_aggregates
+        AFTER INSERT OR UPDATE OR DELETE ON etf_holdings
+        FOR EACH ROW EXECUTE FUNCTION apply_sector_aggregate_delta();
+    """)
+    
+    # 집계 테이블을 처음 만든 경우 기존 보유 정보로 채움
+    if is_new:
+        await conn.execute("""
+            INSERT INTO portfolio_sector_aggregates
+                (portfolio_id, sector, currency, holdings_count, shares, market_value, cost_basis)
+            SELECT portfolio_id, sector, currency, COUNT(*), SUM(shares),
+                   SUM(shares * current_price), SUM(shares * purchase_price)
+            FROM etf_holdings
+            WHERE portfolio_id IS NOT NULL
+            GROUP BY portfolio_id, sector, currency
+            ON CONFLICT (portfolio_id, sector, currency) DO NOTHING;
+        """)
+
+# (버전, 이름, 함수) - 버전은 1부터 빠짐없이 증가해야 함
+MIGRATIONS = [
+    (1, "initial_schema", _create_initial_schema),
+    (2, "portfolio_version", _add_portfolio_version),
+    (3, "sector_aggregates", _create_sector_aggregates),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+async def get_schema_version(conn) -> int:
+    """적용된 최신 마이그레이션 버전 (기록이 없으면 0)"""
+    exists = await conn.fetchval("""
+        SELECT to_regclass('schema_migrations') IS NOT NULL
+    """)
+    if not exists:
+        return 0
+    return await conn.fetchval("""
+        SELECT COALESCE(MAX(version), 0) FROM schema_migrations
+    """)
+
+async def check_schema(conn) -> int:
+    """스키마가 최신인지 확인만 함 (DDL 없음). 뒤처져 있으면 경고 후 현재 버전 반환"""
+    version = await get_schema_version(conn)
+    if version < LATEST_VERSION:
+        logger.error(
+            f"데이터베이스 스키마가 최신이 아닙니다 (현재 {version}, 최신 {LATEST_VERSION}). "
+            "python migrations.py 를 실행하세요."
+        )
+    return version
+
+async def run_migrations(conn) -> list[int]:
+    """대기 중인 마이그레이션을 순서대로 적용하고 적용한 버전 목록 반환"""
+    applied = []
+    # CREATE TABLE IF NOT EXISTS 도 동시에 실행되면 충돌할 수 있으므로 잠금을 먼저 획득
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            );
+        """)
+        current = await get_schema_version(conn)
+        for version, name, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            async with conn.transaction():
+                await migrate(conn)
+                await conn.execute("""
+                    INSERT INTO schema_migrations (version, name) VALUES ($1, $2)
+                """, version, name)
+            logger.info(f"마이그레이션 적용: {version} {name}")
+            applied.append(version)
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+    return applied
+
+async def _connect():
+    import asyncpg
+    import database
+    
+    return await asyncpg.connect(
+        host=database.DB_HOST,
+        port=int(database.DB_PORT),
+        database=database.DB_NAME,
+        user=database.DB_USER,
+        password=database.DB_PASSWORD
+    )
+
+async def migrate_database() -> list[int]:
+    """환경 변수(DB_*)의 데이터베이스에 대기 중인 마이그레이션 적용"""
+    conn = await _connect()
+    try:
+        return await run_migrations(conn)
+    finally:
+        await conn.close()
+
+async def _main(status_only: bool) -> int:
+    if status_only:
+        conn = await _connect()
+        try:
+            version = await get_schema_version(conn)
+        finally:
+            await conn.close()
+        print(f"스키마 버전: {version} / 최신: {LATEST_VERSION}")
+        return 0 if version >= LATEST_VERSION else 1
+    
+    applied = await migrate_database()
+    if applied:
+        print(f"마이그레이션 적용 완료: {', '.join(str(v) for v in applied)}")
+    else:
+        print(f"이미 최신 스키마입니다 (버전 {LATEST_VERSION})")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETF 리밸런서 데이터베이스 마이그레이션")
+    parser.add_argument("--status", action="store_true", help="적용 여부만 확인 (최신이 아니면 종료 코드 1)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.status)))
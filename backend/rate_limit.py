@@ -0,0 +1,149 @@
+"""
+사용자/라우트별 토큰 버킷 레이트 리밋.
+
+기본은 프로세스 메모리에 버킷을 보관하며, RATE_LIMIT_REDIS_URL 을 지정하면
+여러 워커가 Redis 에 있는 버킷을 공유합니다 (redis 패키지 필요).
+Redis 오류 시에는 요청을 막지 않고 통과시킵니다.
+
+라우트 그룹별 한도는 환경 변수로 조정합니다.
+    RATE_LIMIT_<GROUP>_PER_SEC : 초당 채워지는 토큰 수
+    RATE_LIMIT_<GROUP>_BURST   : 버킷 크기 (순간 최대 요청 수)
+"""
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException
+
+from auth import CurrentUser, get_current_user
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+
+@dataclass(frozen=True)
+class RateLimit:
+    per_second: float
+    burst: int
+
+def _limit_from_env(group: str, per_second: float, burst: int) -> RateLimit:
+    prefix = f"RATE_LIMIT_{group.upper()}"
+    return RateLimit(
+        per_second=float(os.getenv(f"{prefix}_PER_SEC", per_second)),
+        burst=int(os.getenv(f"{prefix}_BURST", burst))
+    )
+
+# 라우트 그룹별 기본 한도 (yfinance 를 호출하는 시세 조회는 더 엄격하게)
+RATE_LIMITS = {
+    "stock": _limit_from_env("stock", 2.0, 10),
+    "portfolio_read": _limit_from_env("portfolio_read", 20.0, 40),
+    "portfolio_write": _limit_from_env("portfolio_write", 5.0, 20),
+    # 시뮬레이션은 요청 하나가 CPU 를 수 초간 사용할 수 있음
+    "simulate": _limit_from_env("simulate", 0.2, 3),
+}
+
+class MemoryBackend:
+    """프로세스 메모리 토큰 버킷 (이벤트 루프 안에서만 호출되므로 잠금 불필요)"""
+
+    # 이 횟수만큼 호출될 때마다 가득 찬(=없는 것과 같은) 버킷 정리
+    SWEEP_INTERVAL = 10_000
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self._calls = 0
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """토큰 1개 사용. 허용되면 0, 거부되면 다시 시도할 때까지의 초 반환"""
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.get(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.per_second
+        self.buckets[key] = (tokens, now)
+
+        self._calls += 1
+        if self._calls >= self.SWEEP_INTERVAL:
+            self._calls = 0
+            self._sweep(now)
+        return retry_after
+
+    def _sweep(self, now: float):
+        # 한도 중 가장 느린 충전 시간보다 오래 쓰이지 않은 버킷은 이미 가득 찬 상태
+        idle = max(limit.burst / limit.per_second for limit in RATE_LIMITS.values())
+        self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < idle}
+
+class RedisBackend:
+    """Redis 공유 토큰 버킷 (Lua 스크립트로 원자적으로 갱신)"""
+
+    SCRIPT = """
+        local rate = tonumber(ARGV[1])
+        local burst = tonumber(ARGV[2])
+        local t = redis.call('TIME')
+        local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+        local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(data[1]) or burst
+        local ts = tonumber(data[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+        local retry = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            retry = (1 - tokens) / rate
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return tostring(retry)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL 을 사용하려면 redis 패키지가 필요합니다 (pip install redis)") from e
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        try:
+            result = await self.script(keys=[f"ratelimit:{key}"], args=[limit.per_second, limit.burst])
+            return float(result)
+        except Exception as e:
+            logger.warning(f"Redis 레이트 리밋 확인 실패 - 요청 허용: {e}")
+            return 0.0
+
+class RateLimiter:
+    def __init__(self, enabled: bool = RATE_LIMIT_ENABLED, redis_url: str = RATE_LIMIT_REDIS_URL):
+        self.enabled = enabled
+        self.backend = RedisBackend(redis_url) if redis_url else MemoryBackend()
+
+    async def check(self, key: str, group: str):
+        """한도를 넘으면 429 HTTPException"""
+        if not self.enabled:
+            return
+        retry_after = await self.backend.acquire(f"{group}:{key}", RATE_LIMITS[group])
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="요청이 너무 많습니다. 잠시 후 다시 시도하세요.",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+rate_limiter = RateLimiter()
+
+def rate_limit(group: str):
+    """라우트 그룹 한도를 적용하고 현재 사용자를 돌려주는 FastAPI 의존성 생성"""
+    if group not in RATE_LIMITS:
+        raise ValueError(f"알 수 없는 레이트 리밋 그룹: {group}")
+
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        await rate_limiter.check(user.rate_limit_key, group)
+        return user
+
+    return dependency
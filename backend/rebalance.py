@@ -0,0 +1,105 @@
+# 목표 포트폴리오 비중 (frontend/src/utils/rebalanceCalculator.ts 와 동일)
+TARGET_ALLOCATION = {
+    "growth": 40,    # 성장주 ETF 40%
+    "dividend": 40,  # 배당주 ETF 40%
+    "bond": 10,      # 채권 ETF 10%
+    "gold": 5,       # 금 ETF 5%
+    "crypto": 5      # 비트코인 5%
+}
+
+# 섹터 한글명 매핑
+SECTOR_NAMES = {
+    "growth": "성장주 ETF",
+    "dividend": "배당주 ETF",
+    "bond": "채권 ETF",
+    "gold": "금 ETF",
+    "crypto": "비트코인"
+}
+
+# 기본 환율 (USD/KRW) - 환율 API 연동 전까지 사용
+DEFAULT_USD_TO_KRW_RATE = 1300.0
+
+# 리밸런싱을 권장하는 최소 비중 차이 (%)
+REBALANCE_THRESHOLD = 1.0
+
+def convert_to_krw(amount: float, currency: str, usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> float:
+    """금액을 원화로 변환 (KRW 외의 통화는 USD로 간주)"""
+    if currency == "KRW":
+        return amount
+    return amount * usd_to_krw_rate
+
+def holding_value_in_krw(holding: dict, usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> float:
+    """ETF 보유 정보의 평가금액을 원화로 계산"""
+    value = float(holding["shares"]) * float(holding["current_price"])
+    return convert_to_krw(value, holding.get("currency") or "USD", usd_to_krw_rate)
+
+def sector_values_from_holdings(holdings: list[dict], usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> tuple[dict, float]:
+    """보유 종목별 평가금액을 섹터별로 합산 (원화 기준, 총액 포함)"""
+    sector_values = {sector: 0.0 for sector in TARGET_ALLOCATION}
+    total_value = 0.0
+    for holding in holdings:
+        value = holding_value_in_krw(holding, usd_to_krw_rate)
+        total_value += value
+        if holding["sector"] in sector_values:
+            sector_values[holding["sector"]] += value
+    return sector_values, total_value
+
+def sector_values_from_aggregates(aggregates: list[dict], usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> tuple[dict, float]:
+    """섹터/통화별 집계 행의 평가금액을 섹터별로 합산 (원화 기준, 총액 포함)"""
+    sector_values = {sector: 0.0 for sector in TARGET_ALLOCATION}
+    total_value = 0.0
+    for aggregate in aggregates:
+        value = convert_to_krw(float(aggregate["market_value"]), aggregate["currency"], usd_to_krw_rate)
+        total_value += value
+        if aggregate["sector"] in sector_values:
+            sector_values[aggregate["sector"]] += value
+    return sector_values, total_value
+
+def build_sector_allocation(sector_values: dict, total_value: float) -> list[dict]:
+    """섹터별 평가금액으로 현재/목표 비중 계산"""
+    allocations = []
+    for sector, target in TARGET_ALLOCATION.items():
+        value = sector_values.get(sector, 0.0)
+        allocations.append({
+            "sector": sector,
+            "sector_name": SECTOR_NAMES[sector],
+            "value": value,
+            "percentage": (value / total_value) * 100 if total_value > 0 else 0.0,
+            "target_percentage": target
+        })
+    return allocations
+
+def build_rebalance_recommendations(allocations: list[dict], total_value: float) -> list[dict]:
+    """섹터별 비중으로 매수/매도/유지 권장사항 계산"""
+    recommendations = []
+    for allocation in allocations:
+        difference = allocation["target_percentage"] - allocation["percentage"]
+
+        # 액션 결정 (1% 이상 차이날 때만 권장)
+        action = "hold"
+        if abs(difference) >= REBALANCE_THRESHOLD:
+            action = "buy" if difference > 0 else "sell"
+
+        recommendations.append({
+            "sector": allocation["sector"],
+            "sector_name": allocation["sector_name"],
+            "current_weight": allocation["percentage"],
+            "target_weight": allocation["target_percentage"],
+            "action": action,
+            "recommended_amount": (difference / 100) * total_value
+        })
+
+    # 권장사항 정렬: 매수 권장 > 매도 권장 > 유지
+    action_order = {"buy": 0, "sell": 1, "hold": 2}
+    recommendations.sort(key=lambda r: (action_order[r["action"]], -abs(r["recommended_amount"])))
+    return recommendations
+
+def calculate_sector_allocation(holdings: list[dict], usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> list[dict]:
+    """섹터별 자산 배분 계산 (환율 고려)"""
+    sector_values, total_value = sector_values_from_holdings(holdings, usd_to_krw_rate)
+    return build_sector_allocation(sector_values, total_value)
+
+def calculate_sector_rebalance_recommendations(holdings: list[dict], usd_to_krw_rate: float = DEFAULT_USD_TO_KRW_RATE) -> list[dict]:
+    """섹터별 리밸런싱 권장사항 계산 (환율 고려)"""
+    sector_values, total_value = sector_values_from_holdings(holdings, usd_to_krw_rate)
+    return build_rebalance_recommendations(build_sector_allocation(sector_values, total_value), total_value)
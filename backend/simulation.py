@@ -0,0 +1,237 @@
+"""
+적립/인출 시나리오 시뮬레이션 (What-if).
+
+섹터별 현재 평가금액에서 출발해 월 단위로 가격 변동과 현금 흐름을 적용하고,
+경로(path) 수천 개를 numpy 로 한꺼번에 계산해 비중/평가금액의 백분위 구간과
+목표 비중 도달 시점을 구합니다. 경로 수가 많으면 여러 프로세스로 나눠 계산합니다.
+
+이 모듈은 numpy 를 불러오므로 main.py 에서는 시뮬레이션 요청 시에만 import 합니다.
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+# 한 프로세스가 맡는 최대 경로 수 (이보다 많으면 프로세스 풀로 분할)
+SIMULATION_CHUNK_PATHS = int(os.getenv("SIMULATION_CHUNK_PATHS", "5000"))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 응답에 포함할 최대 시점 수 (기간이 길면 간격을 늘림)
+MAX_CHECKPOINTS = 120
+
+# Monte Carlo 기본 가정 (연 기대수익률, 연 변동성)
+DEFAULT_ANNUAL_RETURNS = {"growth": 0.08, "dividend": 0.06, "bond": 0.03, "gold": 0.04, "crypto": 0.15}
+DEFAULT_ANNUAL_VOLATILITY = {"growth": 0.18, "dividend": 0.14, "bond": 0.06, "gold": 0.15, "crypto": 0.70}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 이벤트 루프/로깅 스레드가 있는 프로세스에서 fork 하지 않도록 spawn 사용
+        _executor = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+def shutdown_executor():
+    """프로세스 풀 종료 (서버 종료 시 호출)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def build_cash_flow_schedule(cash_flows: list[dict], months: int) -> np.ndarray:
+    """현금 흐름 목록을 월별 금액 배열로 변환 (음수는 인출)"""
+    schedule = np.zeros(months)
+    for flow in cash_flows:
+        start = flow.get("start_month", 0)
+        if start >= months:
+            continue
+        if flow.get("frequency", "monthly") == "once":
+            schedule[start] += flow["amount"]
+            continue
+        end = flow.get("end_month")
+        end = months if end is None else min(end + 1, months)
+        schedule[start:end] += flow["amount"]
+    return schedule
+
+def checkpoint_months(months: int) -> np.ndarray:
+    """응답에 담을 시점 (0부터 시작하는 월 인덱스, 마지막 달 포함)"""
+    step = max(1, math.ceil(months / MAX_CHECKPOINTS))
+    points = np.arange(step - 1, months, step)
+    if points[-1] != months - 1:
+        points = np.append(points, months - 1)
+    return points
+
+def _monthly_returns(rng: np.random.Generator, model: dict, n_paths: int, n_sectors: int) -> np.ndarray:
+    """한 달치 섹터별 수익률 (n_sectors x n_paths)"""
+    if model["type"] == "flat":
+        return np.zeros((n_sectors, n_paths))
+    if model["type"] == "bootstrap":
+        # 과거 월 수익률 행 전체를 뽑아 섹터 간 상관관계를 유지
+        history = model["history"]
+        return history[:, rng.integers(0, history.shape[1], size=n_paths)]
+    # monte_carlo: 로그정규 분포
+    log_returns = rng.standard_normal((n_sectors, n_paths))
+    log_returns *= model["sigma"][:, None]
+    log_returns += model["mu"][:, None]
+    return np.expm1(log_returns, out=log_returns)
+
+def simulate_paths(
+    initial_values: np.ndarray,
+    targets: np.ndarray,
+    schedule: np.ndarray,
+    model: dict,
+    rebalance: str,
+    tolerance: float,
+    checkpoints: np.ndarray,
+    n_paths: int,
+    seed
+) -> dict:
+    """
+    경로 n_paths 개를 월 단위로 시뮬레이션 (프로세스 풀에서도 실행되므로 순수 함수로 유지).
+
+    rebalance:
+        cash_flow_only - 적립금은 부족한 섹터부터 매수, 인출은 초과한 섹터부터 매도
+        full           - 매달 목표 비중으로 전체 리밸런싱
+        none           - 적립/인출을 목표 비중대로 나누고 리밸런싱하지 않음
+    """
+    rng = np.random.default_rng(seed)
+    n_sectors = len(targets)
+    # 섹터 수(5)가 경로 수보다 훨씬 작으므로 (섹터 x 경로) 배치로 두어 섹터 합계를 연속 메모리 덧셈으로 계산
+    values = np.repeat(initial_values.astype(float)[:, None], n_paths, axis=1)
+    target_column = targets[:, None]
+
+    checkpoint_index = {int(month): i for i, month in enumerate(checkpoints)}
+    totals_out = np.zeros((n_paths, len(checkpoints)), dtype=np.float32)
+    weights_out = np.zeros((n_paths, len(checkpoints), n_sectors), dtype=np.float32)
+    months_to_target = np.full(n_paths, -1, dtype=np.int32)
+
+    for month in range(len(schedule)):
+        values *= 1 + _monthly_returns(rng, model, n_paths, n_sectors)
+        cash = schedule[month]
+        total = values.sum(axis=0)
+
+        if rebalance == "full":
+            values = target_column * np.maximum(total + cash, 0)
+        elif rebalance == "none" or cash == 0:
+            if cash:
+                values = np.maximum(values + cash * target_column, 0)
+        elif cash > 0:
+            # 목표 대비 부족분에 비례해 매수 (부족분이 없으면 목표 비중대로)
+            deficit = np.maximum(target_column * (total + cash) - values, 0)
+            deficit_sum = deficit.sum(axis=0)
+            share = np.divide(deficit, deficit_sum, out=np.repeat(target_column, n_paths, axis=1), where=deficit_sum > 0)
+            values += cash * share
+        else:
+            # 목표 대비 초과분에 비례해 매도 (초과분이 없으면 현재 비중대로)
+            withdrawal = np.minimum(-cash, total)
+            excess = np.maximum(values - target_column * np.maximum(total - withdrawal, 0), 0)
+            basis = np.where(excess.sum(axis=0) > 0, excess, values)
+            basis_sum = basis.sum(axis=0)
+            share = np.divide(basis, basis_sum, out=np.zeros_like(basis), where=basis_sum > 0)
+            values = np.maximum(values - withdrawal * share, 0)
+
+        total = values.sum(axis=0)
+        weights = np.divide(values, total, out=np.zeros_like(values), where=total > 0) * 100
+
+        reached = (np.abs(weights - target_column * 100).max(axis=0) <= tolerance) & (total > 0)
+        months_to_target[(months_to_target < 0) & reached] = month + 1
+
+        if month in checkpoint_index:
+            totals_out[:, checkpoint_index[month]] = total
+            weights_out[:, checkpoint_index[month]] = weights.T
+
+    return {"totals": totals_out, "weights": weights_out, "months_to_target": months_to_target}
+
+def _percentile_dict(data: np.ndarray, percentiles: list[float], axis: int = 0) -> dict:
+    values = np.percentile(data, percentiles, axis=axis)
+    return {f"p{p:g}": np.round(v, 4).tolist() for p, v in zip(percentiles, values)}
+
+def _summarize_results(
+    results: list[dict],
+    sectors: list[str],
+    initial: np.ndarray,
+    checkpoints: np.ndarray,
+    months: int,
+    n_paths: int,
+    percentiles: list[float]
+) -> dict:
+    """청크별 결과를 합쳐 백분위 구간으로 요약 (수십 MB 배열을 다루므로 스레드에서 실행)"""
+    totals = np.concatenate([r["totals"] for r in results])
+    weights = np.concatenate([r["weights"] for r in results])
+    months_to_target = np.concatenate([r["months_to_target"] for r in results])
+
+    reached = months_to_target[months_to_target > 0]
+    initial_total = float(initial.sum())
+    initial_weights = (initial / initial_total * 100) if initial_total > 0 else np.zeros_like(initial)
+
+    return {
+        "paths": n_paths,
+        "months": months,
+        "percentiles": percentiles,
+        "initial": {
+            "total_value": initial_total,
+            "weights": {sector: round(float(w), 4) for sector, w in zip(sectors, initial_weights)}
+        },
+        "months_axis": (checkpoints + 1).tolist(),
+        "value_bands": _percentile_dict(totals, percentiles),
+        "weight_bands": {
+            sector: _percentile_dict(weights[:, :, i], percentiles)
+            for i, sector in enumerate(sectors)
+        },
+        "final_value": _percentile_dict(totals[:, -1], percentiles),
+        "target_reached": {
+            "probability": round(len(reached) / len(months_to_target), 4),
+            "months": _percentile_dict(reached, percentiles) if len(reached) else None
+        },
+        "depleted_probability": round(float((totals[:, -1] <= 0).mean()), 4)
+    }
+
+async def run_simulation(
+    sectors: list[str],
+    initial_values: list[float],
+    targets: list[float],
+    cash_flows: list[dict],
+    months: int,
+    model: dict,
+    rebalance: str,
+    tolerance: float,
+    n_paths: int,
+    percentiles: list[float],
+    seed: Optional[int] = None
+) -> dict:
+    """시뮬레이션을 실행하고 백분위 구간으로 요약 (경로 계산과 요약 모두 스레드/프로세스에서 실행)"""
+    initial = np.asarray(initial_values, dtype=float)
+    target_weights = np.asarray(targets, dtype=float) / 100
+    schedule = build_cash_flow_schedule(cash_flows, months)
+    checkpoints = checkpoint_months(months)
+
+    if model["type"] == "monte_carlo":
+        mu = np.asarray(model["annual_returns"], dtype=float)
+        sigma = np.asarray(model["annual_volatility"], dtype=float)
+        model = {"type": "monte_carlo", "mu": (np.log1p(mu) - 0.5 * sigma ** 2) / 12, "sigma": sigma / math.sqrt(12)}
+    elif model["type"] == "bootstrap":
+        model = {"type": "bootstrap", "history": np.asarray(model["history"], dtype=float).T}
+
+    # flat 모델은 모든 경로가 같으므로 한 경로만 계산 (백분위와 확률은 경로 수와 무관)
+    simulated_paths = 1 if model["type"] == "flat" else n_paths
+
+    # 청크별로 독립된 난수 시드 (같은 seed 와 경로 수면 같은 결과)
+    n_chunks = max(1, math.ceil(simulated_paths / SIMULATION_CHUNK_PATHS))
+    chunk_sizes = [simulated_paths // n_chunks + (1 if i < simulated_paths % n_chunks else 0) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    args = [(initial, target_weights, schedule, model, rebalance, tolerance, checkpoints, size, chunk_seed)
+            for size, chunk_seed in zip(chunk_sizes, seeds)]
+
+    loop = asyncio.get_running_loop()
+    if n_chunks == 1:
+        results = [await asyncio.to_thread(simulate_paths, *args[0])]
+    else:
+        executor = _get_executor()
+        results = await asyncio.gather(*(loop.run_in_executor(executor, simulate_paths, *a) for a in args))
+
+    return await asyncio.to_thread(_summarize_results, results, sectors, initial, checkpoints, months, n_paths, percentiles)
@@ -13,6 +13,10 @@ source venv/bin/activate
 echo "의존성을 설치합니다..."
 pip install -r requirements.txt
 
+# 데이터베이스 마이그레이션 (서버 기동 시에는 스키마 버전만 확인)
+echo "데이터베이스 마이그레이션을 적용합니다..."
+python migrations.py
+
 # FastAPI 서버 실행
 echo "FastAPI 서버를 시작합니다..."
-uvicorn main:app --reload --host 0.0.0.0 --port 8000 
\ No newline at end of file
+uvicorn main:app --reload --host 0.0.0.0 --port 8000 --no-access-log 
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""auth.decode_jwt 검증 테스트 (python -m unittest discover -s tests, backend 디렉터리에서 실행)"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+import unittest
+
+from auth import decode_jwt
+
+SECRET = "test-secret"
+
+def _b64(data) -> str:
+    raw = data if isinstance(data, bytes) else json.dumps(data).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def make_token(payload, header=None, secret: str = SECRET) -> str:
+    signing_input = f"{_b64(header if header is not None else {'alg': 'HS256', 'typ': 'JWT'})}.{_b64(payload)}"
+    signature = hmac.new(secret.encode("utf-8"), signing_input.encode("ascii"), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(signature)}"
+
+def valid_payload(**overrides) -> dict:
+    payload = {"sub": "user-1", "exp": int(time.time()) + 3600}
+    payload.update(overrides)
+    return payload
+
+class DecodeJwtTest(unittest.TestCase):
+    def assertRejected(self, token: str):
+        with self.assertRaises(ValueError):
+            decode_jwt(token, SECRET)
+
+    def test_valid_token(self):
+        payload = decode_jwt(make_token(valid_payload()), SECRET)
+        self.assertEqual(payload["sub"], "user-1")
+
+    def test_bad_signature(self):
+        self.assertRejected(make_token(valid_payload(), secret="other-secret"))
+
+    def test_tampered_payload(self):
+        header, _, signature = make_token(valid_payload()).split(".")
+        self.assertRejected(f"{header}.{_b64(valid_payload(sub='admin'))}.{signature}")
+
+    def test_wrong_alg(self):
+        self.assertRejected(make_token(valid_payload(), header={"alg": "none"}))
+        self.assertRejected(make_token(valid_payload(), header={"alg": "HS512"}))
+
+    def test_expired(self):
+        self.assertRejected(make_token(valid_payload(exp=int(time.time()) - 1)))
+
+    def test_missing_or_invalid_exp(self):
+        payload = valid_payload()
+        del payload["exp"]
+        self.assertRejected(make_token(payload))
+        self.assertRejected(make_token(valid_payload(exp=None)))
+        self.assertRejected(make_token(valid_payload(exp="never")))
+        self.assertRejected(make_token(valid_payload(exp=True)))
+
+    def test_not_before(self):
+        self.assertRejected(make_token(valid_payload(nbf=int(time.time()) + 600)))
+        self.assertRejected(make_token(valid_payload(nbf="soon")))
+        payload = decode_jwt(make_token(valid_payload(nbf=int(time.time()) - 60)), SECRET)
+        self.assertEqual(payload["sub"], "user-1")
+
+    def test_missing_sub(self):
+        payload = valid_payload()
+        del payload["sub"]
+        self.assertRejected(make_token(payload))
+        self.assertRejected(make_token(valid_payload(sub="")))
+        self.assertRejected(make_token(valid_payload(sub=123)))
+
+    def test_malformed_segments(self):
+        token = make_token(valid_payload())
+        header, payload, signature = token.split(".")
+        self.assertRejected("")
+        self.assertRejected("a.b")
+        self.assertRejected(token + ".extra")
+        self.assertRejected(f"!!!.{payload}.{signature}")
+        self.assertRejected(f"{header}.{payload}.!!!")
+        self.assertRejected(f"{_b64(b'not json')}.{payload}.{signature}")
+        self.assertRejected(f"{_b64(bytes([0xff, 0xfe]))}.{payload}.{signature}")
+        self.assertRejected(make_token(valid_payload(), header=b"not json"))
+
+    def test_non_object_header_or_payload(self):
+        self.assertRejected(make_token({}, header=[]))
+        self.assertRejected(make_token({}, header="HS256"))
+        self.assertRejected(make_token([]))
+        self.assertRejected(make_token("user-1"))
+        self.assertRejected(make_token(None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""http_cache ETag 테스트 (python -m unittest discover -s tests)"""
+import unittest
+
+from http_cache import etag_matches, make_etag
+
+class EtagTest(unittest.TestCase):
+    def test_make_etag_is_weak_and_stable(self):
+        etag = make_etag("portfolio-1", 3, "2024-01-02T00:00:00")
+        self.assertTrue(etag.startswith('W/"') and etag.endswith('"'))
+        self.assertEqual(etag, make_etag("portfolio-1", 3, "2024-01-02T00:00:00"))
+        self.assertNotEqual(etag, make_etag("portfolio-1", 4, "2024-01-02T00:00:00"))
+
+    def test_exact_match(self):
+        etag = make_etag("a")
+        self.assertTrue(etag_matches(etag, etag))
+
+    def test_weak_comparison_ignores_prefix(self):
+        # 프록시가 W/ 를 붙이거나 떼도 같은 표현으로 간주
+        etag = make_etag("a")
+        opaque = etag[2:]
+        self.assertTrue(etag_matches(opaque, etag))
+        self.assertTrue(etag_matches(etag, opaque))
+
+    def test_list_and_wildcard(self):
+        etag = make_etag("a")
+        self.assertTrue(etag_matches(f'"other", {etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+
+    def test_no_match(self):
+        etag = make_etag("a")
+        self.assertFalse(etag_matches(None, etag))
+        self.assertFalse(etag_matches("", etag))
+        self.assertFalse(etag_matches(make_etag("b"), etag))
+        self.assertFalse(etag_matches(etag[3:-1], etag))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""PATCH /api/portfolios/{id}/holdings 테스트 (인메모리 저장소, python -m unittest discover -s tests)"""
+import logging
+import unittest
+import uuid
+
+from fastapi.testclient import TestClient
+
+import main
+import rate_limit
+from benchmarks import memory_store
+
+def make_holding(symbol: str, sector: str = "growth", shares: float = 10) -> dict:
+    return {
+        "symbol": symbol,
+        "name": f"{symbol} ETF",
+        "shares": shares,
+        "currentPrice": 100,
+        "purchasePrice": 90,
+        "purchaseDate": "2024-01-02",
+        "sector": sector,
+        "currency": "USD"
+    }
+
+def add_operation(symbol: str) -> dict:
+    return {"op": "add", **make_holding(symbol, sector="bond", shares=1)}
+
+class PatchHoldingsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # 요청마다 남는 접근/httpx 로그가 테스트 출력에 섞이지 않도록 함
+        logging.getLogger().setLevel(logging.WARNING)
+        rate_limit.rate_limiter.enabled = False
+        memory_store.install(main)
+        cls.client = TestClient(main.app)
+
+    def create_portfolio(self, *symbols: str) -> dict:
+        response = self.client.post("/api/portfolios", json={
+            "name": "test",
+            "etf_holdings": [make_holding(symbol) for symbol in symbols]
+        })
+        self.assertEqual(response.status_code, 200)
+        return self.get_portfolio(response.json()["portfolio_id"])
+
+    def get_portfolio(self, portfolio_id: str) -> dict:
+        return self.client.get(f"/api/portfolios/{portfolio_id}").json()
+
+    def patch(self, portfolio: dict, operations: list[dict]):
+        return self.client.patch(f"/api/portfolios/{portfolio['id']}/holdings", json={
+            "version": portfolio["version"],
+            "operations": operations
+        })
+
+    def holding_id(self, portfolio: dict, symbol: str) -> str:
+        return next(h["id"] for h in portfolio["holdings"] if h["symbol"] == symbol)
+
+    def test_remove_update_add_in_one_request(self):
+        portfolio = self.create_portfolio("SPY", "QQQ", "TLT")
+        response = self.patch(portfolio, [
+            add_operation("GLD"),
+            {"op": "update", "id": self.holding_id(portfolio, "QQQ"), "shares": 7},
+            {"op": "remove", "id": self.holding_id(portfolio, "SPY")}
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+
+        after = self.get_portfolio(portfolio["id"])
+        self.assertEqual(body["portfolio"]["version"], portfolio["version"] + 1)
+        self.assertEqual(after["version"], body["portfolio"]["version"])
+        self.assertEqual({h["symbol"]: h["shares"] for h in after["holdings"]}, {"QQQ": 7, "TLT": 10, "GLD": 1})
+        self.assertEqual(body["added_holding_ids"], [self.holding_id(after, "GLD")])
+
+    def test_update_then_remove_same_holding_is_not_found(self):
+        # 목록 순서와 무관하게 삭제가 먼저 적용되므로 수정 대상이 없어짐
+        portfolio = self.create_portfolio("SPY", "QQQ")
+        spy = self.holding_id(portfolio, "SPY")
+        response = self.patch(portfolio, [
+            {"op": "update", "id": spy, "shares": 1},
+            {"op": "remove", "id": spy}
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertIn(spy, response.json()["detail"])
+
+        # 실패한 요청은 아무것도 바꾸지 않음
+        after = self.get_portfolio(portfolio["id"])
+        self.assertEqual(after["version"], portfolio["version"])
+        self.assertEqual(len(after["holdings"]), 2)
+
+    def test_duplicate_remove_is_applied_once(self):
+        portfolio = self.create_portfolio("SPY", "QQQ")
+        spy = self.holding_id(portfolio, "SPY")
+        response = self.patch(portfolio, [{"op": "remove", "id": spy}, {"op": "remove", "id": spy}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([h["symbol"] for h in self.get_portfolio(portfolio["id"])["holdings"]], ["QQQ"])
+
+    def test_stale_version_conflicts(self):
+        portfolio = self.create_portfolio("SPY")
+        spy = self.holding_id(portfolio, "SPY")
+        self.assertEqual(self.patch(portfolio, [{"op": "update", "id": spy, "shares": 2}]).status_code, 200)
+
+        response = self.patch(portfolio, [{"op": "update", "id": spy, "shares": 3}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["detail"]["current_version"], portfolio["version"] + 1)
+        self.assertEqual(self.get_portfolio(portfolio["id"])["holdings"][0]["shares"], 2)
+
+    def test_unknown_holding_is_not_found(self):
+        portfolio = self.create_portfolio("SPY")
+        response = self.patch(portfolio, [{"op": "remove", "id": str(uuid.uuid4())}])
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_ids(self):
+        portfolio = self.create_portfolio("SPY")
+        self.assertEqual(self.patch(portfolio, [{"op": "remove", "id": "not-a-uuid"}]).status_code, 422)
+        self.assertEqual(self.patch(portfolio, [{"op": "update", "shares": 1}]).status_code, 422)
+        self.assertEqual(self.patch(portfolio, [{"op": "add", "symbol": "GLD"}]).status_code, 422)
+        response = self.client.patch("/api/portfolios/abc/holdings", json={"version": 1, "operations": []})
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == "__main__":
+    unittest.main()
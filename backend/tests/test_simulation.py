@@ -0,0 +1,116 @@
+"""simulation 모듈 테스트 (python -m unittest discover -s tests)"""
+import unittest
+
+import numpy as np
+
+from simulation import build_cash_flow_schedule, run_simulation, simulate_paths
+
+FLAT = {"type": "flat"}
+
+def run_one_month(initial: list[float], targets: list[float], cash: float, rebalance: str = "cash_flow_only", n_paths: int = 3) -> dict:
+    """가격 변동 없이 한 달 동안 현금 흐름 cash 만 적용"""
+    return simulate_paths(
+        np.asarray(initial, dtype=float),
+        np.asarray(targets, dtype=float),
+        np.array([cash], dtype=float),
+        FLAT,
+        rebalance,
+        0.01,
+        np.array([0]),
+        n_paths,
+        0
+    )
+
+def sector_values(result: dict) -> np.ndarray:
+    """첫 경로의 마지막 시점 섹터별 평가금액"""
+    return result["weights"][0, -1] / 100 * result["totals"][0, -1]
+
+class CashFlowScheduleTest(unittest.TestCase):
+    def test_monthly_with_inclusive_end(self):
+        schedule = build_cash_flow_schedule([{"amount": 100, "start_month": 1, "end_month": 3}], 6)
+        np.testing.assert_array_equal(schedule, [0, 100, 100, 100, 0, 0])
+
+    def test_monthly_without_end_runs_to_horizon(self):
+        schedule = build_cash_flow_schedule([{"amount": 50, "start_month": 2}], 5)
+        np.testing.assert_array_equal(schedule, [0, 0, 50, 50, 50])
+
+    def test_once_and_withdrawals_are_summed(self):
+        schedule = build_cash_flow_schedule([
+            {"amount": 100},
+            {"amount": -30, "frequency": "once", "start_month": 1},
+            {"amount": 500, "frequency": "once", "start_month": 1}
+        ], 3)
+        np.testing.assert_array_equal(schedule, [100, 570, 100])
+
+    def test_flows_outside_horizon_are_clipped(self):
+        schedule = build_cash_flow_schedule([
+            {"amount": 10, "start_month": 5},
+            {"amount": 10, "frequency": "once", "start_month": 9},
+            {"amount": 1, "start_month": 3, "end_month": 99}
+        ], 5)
+        np.testing.assert_array_equal(schedule, [0, 0, 0, 1, 1])
+
+class SimulatePathsTest(unittest.TestCase):
+    def test_cash_equal_to_total_deficit_lands_on_target(self):
+        result = run_one_month([60, 40], [0.5, 0.5], 20)
+        np.testing.assert_allclose(sector_values(result), [60, 60], rtol=1e-6)
+        np.testing.assert_array_equal(result["months_to_target"], [1, 1, 1])
+
+    def test_new_cash_buys_only_underweight_sectors(self):
+        result = run_one_month([60, 40], [0.5, 0.5], 10)
+        np.testing.assert_allclose(sector_values(result), [60, 50], rtol=1e-6)
+        np.testing.assert_array_equal(result["months_to_target"], [-1, -1, -1])
+
+    def test_new_cash_at_target_is_split_by_target_weights(self):
+        result = run_one_month([50, 30, 20], [0.5, 0.3, 0.2], 100)
+        np.testing.assert_allclose(sector_values(result), [100, 60, 40], rtol=1e-6)
+
+    def test_withdrawal_sells_only_overweight_sectors(self):
+        result = run_one_month([80, 20], [0.5, 0.5], -30)
+        np.testing.assert_allclose(sector_values(result), [50, 20], rtol=1e-6)
+
+    def test_withdrawal_at_target_sells_by_current_weights(self):
+        result = run_one_month([50, 50], [0.5, 0.5], -20)
+        np.testing.assert_allclose(sector_values(result), [40, 40], rtol=1e-6)
+
+    def test_withdrawal_larger_than_total_depletes(self):
+        result = run_one_month([30, 20], [0.5, 0.5], -80)
+        np.testing.assert_array_equal(result["totals"][:, -1], [0, 0, 0])
+        np.testing.assert_array_equal(result["weights"][:, -1], np.zeros((3, 2)))
+
+    def test_full_rebalance(self):
+        result = run_one_month([90, 10], [0.5, 0.5], 20, rebalance="full")
+        np.testing.assert_allclose(sector_values(result), [60, 60], rtol=1e-6)
+
+    def test_none_splits_cash_without_rebalancing(self):
+        result = run_one_month([90, 10], [0.5, 0.5], 20, rebalance="none")
+        np.testing.assert_allclose(sector_values(result), [100, 20], rtol=1e-6)
+
+class RunSimulationTest(unittest.IsolatedAsyncioTestCase):
+    async def simulate(self, model: dict, n_paths: int, seed=None) -> dict:
+        return await run_simulation(
+            ["growth", "bond"], [600.0, 400.0], [50, 50],
+            [{"amount": 100, "frequency": "monthly", "start_month": 0}],
+            24, model, "cash_flow_only", 1.0, n_paths, [5, 50, 95], seed
+        )
+
+    async def test_flat_model_bands_collapse(self):
+        result = await self.simulate(FLAT, 500)
+        self.assertEqual(result["paths"], 500)
+        self.assertEqual(result["months_axis"][-1], 24)
+        self.assertEqual(result["final_value"], {"p5": 3400.0, "p50": 3400.0, "p95": 3400.0})
+        self.assertEqual(result["target_reached"]["probability"], 1.0)
+        self.assertEqual(result["target_reached"]["months"]["p50"], 2.0)
+        self.assertEqual(result["initial"]["weights"], {"growth": 60.0, "bond": 40.0})
+
+    async def test_monte_carlo_is_reproducible_with_seed(self):
+        model = {"type": "monte_carlo", "annual_returns": [0.08, 0.03], "annual_volatility": [0.2, 0.05]}
+        first = await self.simulate(model, 200, seed=7)
+        second = await self.simulate(model, 200, seed=7)
+        self.assertEqual(first, second)
+        bands = first["value_bands"]
+        self.assertTrue(all(low <= mid <= high for low, mid, high in zip(bands["p5"], bands["p50"], bands["p95"])))
+        self.assertLess(bands["p5"][-1], bands["p95"][-1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,10 +10,21 @@ import { ETFHolding, SectorAllocation, SectorRebalanceRecommendation, PortfolioS
 import { 
   calculateSectorAllocation, 
   calculateSectorRebalanceRecommendations,
-  calculatePortfolioSummary 
+  calculatePortfolioSummary,
+  fetchSectorAnalysis
 } from '@/utils/rebalanceCalculator';
 import { BarChart3, Target, AlertTriangle, Save, Upload, List } from 'lucide-react';
-import { savePortfolio, getPortfolios, getPortfolio, updatePortfolio, type PortfolioResponse } from '@/utils/portfolioApi';
+import {
+  savePortfolio,
+  getPortfolios,
+  getPortfolio,
+  updatePortfolio,
+  patchPortfolioHoldings,
+  buildHoldingOperations,
+  resolveSavedHoldings,
+  PortfolioConflictError,
+  type PortfolioResponse
+} from '@/utils/portfolioApi';
 
 export default function Home() {
   const [etfs, setEtfs] = useState<ETFHolding[]>([]);
@@ -31,7 +42,51 @@ export default function Home() {
   const [isUpdateMode, setIsUpdateMode] = useState(false);
   const [originalPortfolioName, setOriginalPortfolioName] = useState('');
   const [originalPortfolioDescription, setOriginalPortfolioDescription] = useState('');
+  // 마지막으로 불러온/저장한 서버 상태 (동시 수정 감지 및 변경분 계산용)
+  const [portfolioVersion, setPortfolioVersion] = useState<number | null>(null);
+  const [savedHoldings, setSavedHoldings] = useState<PortfolioResponse['holdings']>([]);
 
+  const toETFHoldings = (portfolio: PortfolioResponse): ETFHolding[] =>
+    portfolio.holdings.map(holding => ({
+      id: holding.id,
+      symbol: holding.symbol,
+      name: holding.name,
+      shares: Number(holding.shares),
+      currentPrice: Number(holding.current_price),
+      purchasePrice: Number(holding.purchase_price),
+      purchaseDate: holding.purchase_date,
+      sector: holding.sector as ETFHolding['sector'],
+      currency: holding.currency
+    }));
+
+  // 서버의 포트폴리오 상태를 편집 상태로 반영
+  const applyServerPortfolio = (portfolio: PortfolioResponse): ETFHolding[] => {
+    const loadedEtfs = toETFHoldings(portfolio);
+    setEtfs(loadedEtfs);
+    setCurrentPortfolioId(portfolio.id);
+    setIsUpdateMode(true);
+    setPortfolioVersion(portfolio.version);
+    setSavedHoldings(portfolio.holdings);
+    setPortfolioName(portfolio.name);
+    setPortfolioDescription(portfolio.description || '');
+    setOriginalPortfolioName(portfolio.name);
+    setOriginalPortfolioDescription(portfolio.description || '');
+    return loadedEtfs;
+  };
+
+  // 저장된 포트폴리오는 서버의 섹터 집계로 차트/권장사항 표시
+  const showServerAnalysis = async (portfolioId: string) => {
+    try {
+      const { allocations, recommendations, summary } = await fetchSectorAnalysis(portfolioId);
+      setSectorAllocations(allocations);
+      setRebalanceRecommendations(recommendations);
+      setPortfolioSummary(summary);
+    } catch (error) {
+      console.error('섹터 집계 조회 오류:', error);
+    }
+  };
+
+  // 아직 저장하지 않은 입력값은 서버에 집계가 없으므로 브라우저에서 계산
   const handleETFSubmit = async (submittedEtfs: ETFHolding[]) => {
     setEtfs(submittedEtfs);
     setShowResults(true);
@@ -89,28 +144,57 @@ export default function Home() {
       });
 
       if (isUpdateMode && currentPortfolioId) {
-        // 업데이트 모드
-        console.log('🔄 업데이트 모드로 저장 중...');
-        const result = await updatePortfolio(currentPortfolioId, portfolioData);
-        console.log('✅ 업데이트 완료:', result);
+        // 업데이트 모드: 불러온 버전을 함께 보내 다른 곳에서 먼저 수정했으면 409
+        const metadataChanged =
+          portfolioName !== originalPortfolioName || portfolioDescription !== originalPortfolioDescription;
+        if (metadataChanged || portfolioVersion === null) {
+          console.log('🔄 업데이트 모드로 저장 중...');
+          const result = await updatePortfolio(currentPortfolioId, {
+            ...portfolioData,
+            version: portfolioVersion ?? undefined
+          });
+          console.log('✅ 업데이트 완료:', result);
+          // 전체 교체는 보유 정보 ID 가 모두 바뀌므로 다시 조회
+          applyServerPortfolio(await getPortfolio(currentPortfolioId));
+        } else {
+          // 이름/설명이 그대로면 변경된 보유 종목만 전송
+          const edited = etfs.map((etf, index) => ({ ...portfolioData.etf_holdings[index], id: etf.id }));
+          const operations = buildHoldingOperations(savedHoldings, edited);
+          if (operations.length > 0) {
+            console.log('🔄 변경된 보유 종목만 저장 중...', operations.length);
+            const result = await patchPortfolioHoldings(currentPortfolioId, portfolioVersion, operations);
+            console.log('✅ 업데이트 완료:', result);
+            // 응답의 새 버전과 추가된 종목 ID 로 상태를 갱신 (전체 포트폴리오 재조회 없음)
+            const holdings = resolveSavedHoldings(savedHoldings, edited, result.added_holding_ids);
+            setPortfolioVersion(result.portfolio.version);
+            setSavedHoldings(holdings);
+            setEtfs(etfs.map((etf, index) => ({ ...etf, id: holdings[index].id })));
+          }
+        }
+        await showServerAnalysis(currentPortfolioId);
         alert(`포트폴리오 "${portfolioName}"이 성공적으로 업데이트되었습니다!`);
         setShowSaveModal(false);
-        // 업데이트 모드에서는 이름과 설명을 유지
       } else {
         // 새로 생성 모드
         console.log('🆕 새로 생성 모드로 저장 중...');
         const result = await savePortfolio(portfolioData);
         console.log('✅ 새로 생성 완료:', result);
         alert(`포트폴리오 "${portfolioName}"이 성공적으로 저장되었습니다!`);
-        setCurrentPortfolioId(result.portfolio_id);
-        setIsUpdateMode(true);
-        setOriginalPortfolioName(portfolioName);
-        setOriginalPortfolioDescription(portfolioDescription);
+        // 이후 업데이트에 필요한 버전과 보유 정보 ID 반영
+        applyServerPortfolio(await getPortfolio(result.portfolio_id));
+        await showServerAnalysis(result.portfolio_id);
         setShowSaveModal(false);
         // 새로 생성한 경우 포트폴리오 정보는 유지 (업데이트 가능하도록)
       }
     } catch (error) {
       console.error('❌ 포트폴리오 저장 실패:', error);
+      if (error instanceof PortfolioConflictError && currentPortfolioId) {
+        if (confirm(`${error.message}\n최신 포트폴리오를 다시 불러올까요? (현재 편집 내용은 사라집니다)`)) {
+          setShowSaveModal(false);
+          await handleLoadPortfolio(currentPortfolioId);
+        }
+        return;
+      }
       alert(`포트폴리오 저장 실패: ${error instanceof Error ? error.message : '알 수 없는 오류'}`);
     } finally {
       setIsLoading(false);
@@ -136,48 +220,12 @@ export default function Home() {
     setIsLoading(true);
     try {
       const portfolio = await getPortfolio(portfolioId);
-      const loadedEtfs: ETFHolding[] = portfolio.holdings.map((holding, index) => ({
-        id: `${index + 1}`,
-        symbol: holding.symbol,
-        name: holding.name,
-        shares: holding.shares,
-        currentPrice: holding.current_price,
-        purchasePrice: holding.purchase_price,
-        purchaseDate: holding.purchase_date,
-        sector: holding.sector as ETFHolding['sector'],
-        currency: holding.currency
-      }));
-      
-      setEtfs(loadedEtfs);
+      // 현재 포트폴리오 정보, 버전, 이름/설명(취소 시 복원용) 설정
+      applyServerPortfolio(portfolio);
       setShowResults(true);
       setShowLoadModal(false);
       
-      // 현재 포트폴리오 정보 설정
-      setCurrentPortfolioId(portfolioId);
-      setIsUpdateMode(true);
-      
-      // 포트폴리오 이름과 설명을 저장 모달용 상태에 설정
-      setPortfolioName(portfolio.name);
-      setPortfolioDescription(portfolio.description || '');
-      
-      // 원본 정보 저장 (취소 시 복원용)
-      setOriginalPortfolioName(portfolio.name);
-      setOriginalPortfolioDescription(portfolio.description || '');
-      
-      // 비동기 계산 수행
-      try {
-        const [allocations, recommendations, summary] = await Promise.all([
-          calculateSectorAllocation(loadedEtfs),
-          calculateSectorRebalanceRecommendations(loadedEtfs),
-          calculatePortfolioSummary(loadedEtfs)
-        ]);
-        
-        setSectorAllocations(allocations);
-        setRebalanceRecommendations(recommendations);
-        setPortfolioSummary(summary);
-      } catch (calcError) {
-        console.error('계산 오류:', calcError);
-      }
+      await showServerAnalysis(portfolioId);
       
       alert(`포트폴리오 "${portfolio.name}"를 불러왔습니다.`);
     } catch (error) {
@@ -277,6 +325,8 @@ export default function Home() {
                   if (confirm('새로운 포트폴리오 생성 모드로 전환하시겠습니까?\n현재 편집 중인 포트폴리오 정보는 저장되지 않습니다.')) {
                     setCurrentPortfolioId(null);
                     setIsUpdateMode(false);
+                    setPortfolioVersion(null);
+                    setSavedHoldings([]);
                     setPortfolioName('');
                     setPortfolioDescription('');
                     setOriginalPortfolioName('');
@@ -405,6 +455,8 @@ export default function Home() {
                         if (confirm('새로운 포트폴리오로 생성하시겠습니까? 기존 포트폴리오는 변경되지 않습니다.')) {
                           setIsUpdateMode(false);
                           setCurrentPortfolioId(null);
+                          setPortfolioVersion(null);
+                          setSavedHoldings([]);
                           setPortfolioName('');
                           setPortfolioDescription('');
                           setOriginalPortfolioName('');
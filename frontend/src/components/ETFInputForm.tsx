@@ -256,10 +256,11 @@ export default function ETFInputForm({ onSubmit, initialEtfs }: ETFInputFormProp
       etf.symbol && etf.name && etf.shares && etf.purchasePrice && etf.currentPrice
     ) as ETFHolding[];
     
+    // 불러온 보유 정보의 id/매입일은 유지 (저장 시 변경분만 전송하기 위해 필요)
     const etfsWithIds = validEtfs.map((etf, index) => ({
       ...etf,
-      id: `${index + 1}`,
-      purchaseDate: new Date().toISOString().split('T')[0]
+      id: etf.id || `new-${index + 1}`,
+      purchaseDate: etf.purchaseDate || new Date().toISOString().split('T')[0]
     }));
     
     onSubmit(etfsWithIds);
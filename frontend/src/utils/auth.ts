@@ -0,0 +1,32 @@
+// API 요청에 붙일 사용자 토큰 (백엔드가 sub 클레임으로 사용자를 구분)
+// 로그인 화면은 아직 없으므로 setAuthToken 으로 저장한 토큰이나
+// 개발용 NEXT_PUBLIC_API_TOKEN 을 사용하고, 둘 다 없으면 익명 사용자로 요청합니다.
+// (백엔드에서 ALLOW_ANONYMOUS=false 로 두면 토큰 없이는 401)
+const AUTH_TOKEN_KEY = 'etf-rebalancer-auth-token';
+
+export function getAuthToken(): string | null {
+  if (typeof window !== 'undefined') {
+    const stored = window.localStorage.getItem(AUTH_TOKEN_KEY);
+    if (stored) {
+      return stored;
+    }
+  }
+  return process.env.NEXT_PUBLIC_API_TOKEN || null;
+}
+
+export function setAuthToken(token: string | null): void {
+  if (typeof window === 'undefined') {
+    return;
+  }
+  if (token) {
+    window.localStorage.setItem(AUTH_TOKEN_KEY, token);
+  } else {
+    window.localStorage.removeItem(AUTH_TOKEN_KEY);
+  }
+}
+
+// 모든 API 호출에 사용하는 공통 헤더 (토큰이 있으면 Authorization: Bearer 추가)
+export function authHeaders(headers: Record<string, string> = {}): Record<string, string> {
+  const token = getAuthToken();
+  return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+}
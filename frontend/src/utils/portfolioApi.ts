@@ -1,3 +1,5 @@
+import { authHeaders } from './auth';
+
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 export interface PortfolioSaveRequest {
@@ -13,6 +15,20 @@ export interface PortfolioSaveRequest {
     sector: string;
     currency?: string;
   }>;
+  version?: number; // 지정 시 서버 버전과 다르면 409
+}
+
+export interface HoldingPatchOperation {
+  op: 'add' | 'update' | 'remove';
+  id?: string; // update/remove 대상 보유 정보 ID
+  symbol?: string;
+  name?: string;
+  shares?: number;
+  currentPrice?: number;
+  purchasePrice?: number;
+  purchaseDate?: string;
+  sector?: string;
+  currency?: string;
 }
 
 export interface PortfolioResponse {
@@ -22,7 +38,9 @@ export interface PortfolioResponse {
   user_id: string;
   created_at: string;
   updated_at: string;
+  version: number;
   holdings: Array<{
+    id: string;
     symbol: string;
     name: string;
     shares: number;
@@ -34,13 +52,29 @@ export interface PortfolioResponse {
   }>;
 }
 
+// 다른 곳에서 먼저 수정되어 버전이 맞지 않을 때 (HTTP 409)
+export class PortfolioConflictError extends Error {
+  currentVersion: number | null;
+
+  constructor(currentVersion: number | null) {
+    super('다른 곳에서 포트폴리오가 먼저 수정되었습니다. 새로고침 후 다시 시도하세요.');
+    this.name = 'PortfolioConflictError';
+    this.currentVersion = currentVersion;
+  }
+}
+
+async function conflictError(response: Response): Promise<PortfolioConflictError> {
+  const errorData = await response.json().catch(() => ({}));
+  return new PortfolioConflictError(errorData.detail?.current_version ?? null);
+}
+
 export async function savePortfolio(portfolioData: PortfolioSaveRequest): Promise<{ portfolio_id: string; message: string }> {
   try {
     const response = await fetch(`${API_BASE_URL}/api/portfolios`, {
       method: 'POST',
-      headers: {
+      headers: authHeaders({
         'Content-Type': 'application/json',
-      },
+      }),
       body: JSON.stringify(portfolioData),
     });
 
@@ -56,9 +90,10 @@ export async function savePortfolio(portfolioData: PortfolioSaveRequest): Promis
   }
 }
 
-export async function getPortfolios(userId: string = 'anonymous'): Promise<PortfolioResponse[]> {
+// 사용자는 서버가 Authorization 토큰으로 식별 (토큰이 없으면 익명 사용자)
+export async function getPortfolios(): Promise<PortfolioResponse[]> {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/portfolios?user_id=${userId}`);
+    const response = await fetch(`${API_BASE_URL}/api/portfolios`, { headers: authHeaders() });
     
     if (!response.ok) {
       throw new Error('포트폴리오 목록 조회 실패');
@@ -73,7 +108,7 @@ export async function getPortfolios(userId: string = 'anonymous'): Promise<Portf
 
 export async function getPortfolio(portfolioId: string): Promise<PortfolioResponse> {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}`);
+    const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}`, { headers: authHeaders() });
     
     if (!response.ok) {
       if (response.status === 404) {
@@ -89,17 +124,69 @@ export async function getPortfolio(portfolioId: string): Promise<PortfolioRespon
   }
 }
 
+export interface PortfolioSectorsResponse {
+  portfolio_id: string;
+  usd_to_krw_rate: number;
+  total_value: number;
+  total_cost: number;
+  aggregates: Array<{
+    sector: string;
+    currency: string;
+    holdings_count: number;
+    shares: number;
+    market_value: number;
+    cost_basis: number;
+  }>;
+  allocations: Array<{
+    sector: string;
+    sector_name: string;
+    value: number;
+    percentage: number;
+    target_percentage: number;
+  }>;
+  recommendations: Array<{
+    sector: string;
+    sector_name: string;
+    current_weight: number;
+    target_weight: number;
+    action: 'buy' | 'sell' | 'hold';
+    recommended_amount: number;
+  }>;
+}
+
+export async function getPortfolioSectors(portfolioId: string, usdToKrwRate?: number): Promise<PortfolioSectorsResponse> {
+  try {
+    const query = usdToKrwRate ? `?usd_to_krw_rate=${usdToKrwRate}` : '';
+    const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}/sectors${query}`, { headers: authHeaders() });
+
+    if (!response.ok) {
+      if (response.status === 404) {
+        throw new Error('포트폴리오를 찾을 수 없습니다');
+      }
+      throw new Error('섹터별 자산 배분 조회 실패');
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('섹터별 자산 배분 조회 오류:', error);
+    throw error;
+  }
+}
+
 export async function updatePortfolio(portfolioId: string, portfolioData: PortfolioSaveRequest): Promise<{ portfolio_id: string; message: string }> {
   try {
     const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}`, {
       method: 'PUT',
-      headers: {
+      headers: authHeaders({
         'Content-Type': 'application/json',
-      },
+      }),
       body: JSON.stringify(portfolioData),
     });
 
     if (!response.ok) {
+      if (response.status === 409) {
+        throw await conflictError(response);
+      }
       const errorData = await response.json();
       throw new Error(errorData.detail || '포트폴리오 업데이트 실패');
     }
@@ -111,10 +198,100 @@ export async function updatePortfolio(portfolioId: string, portfolioData: Portfo
   }
 }
 
+type SavedHolding = PortfolioResponse['holdings'][number];
+type EditedHolding = PortfolioSaveRequest['etf_holdings'][number] & { id: string };
+
+// 불러온 보유 정보와 편집 결과를 비교해 PATCH 연산 목록 생성 (서버에 없는 id 는 추가로 처리)
+export function buildHoldingOperations(saved: SavedHolding[], edited: EditedHolding[]): HoldingPatchOperation[] {
+  const savedById = new Map(saved.map(holding => [holding.id, holding]));
+  const editedIds = new Set(edited.map(holding => holding.id));
+  const operations: HoldingPatchOperation[] = saved
+    .filter(holding => !editedIds.has(holding.id))
+    .map((holding): HoldingPatchOperation => ({ op: 'remove', id: holding.id }));
+
+  for (const holding of edited) {
+    const current = savedById.get(holding.id);
+    const { id, ...fields } = holding;
+    if (!current) {
+      operations.push({ op: 'add', ...fields, currency: fields.currency || 'USD' });
+      continue;
+    }
+
+    // DECIMAL 컬럼은 문자열로 올 수 있어 숫자로 비교
+    const changes: HoldingPatchOperation = { op: 'update', id };
+    if (fields.symbol !== current.symbol) changes.symbol = fields.symbol;
+    if (fields.name !== current.name) changes.name = fields.name;
+    if (Number(fields.shares) !== Number(current.shares)) changes.shares = fields.shares;
+    if (Number(fields.currentPrice) !== Number(current.current_price)) changes.currentPrice = fields.currentPrice;
+    if (Number(fields.purchasePrice) !== Number(current.purchase_price)) changes.purchasePrice = fields.purchasePrice;
+    if (fields.purchaseDate !== current.purchase_date) changes.purchaseDate = fields.purchaseDate;
+    if (fields.sector !== current.sector) changes.sector = fields.sector;
+    if ((fields.currency || 'USD') !== current.currency) changes.currency = fields.currency || 'USD';
+    if (Object.keys(changes).length > 2) {
+      operations.push(changes);
+    }
+  }
+  return operations;
+}
+
+// PATCH 성공 후의 서버 보유 정보 (편집 결과에 서버가 돌려준 추가 종목 ID 를 순서대로 채움)
+export function resolveSavedHoldings(saved: SavedHolding[], edited: EditedHolding[], addedIds: string[]): SavedHolding[] {
+  const savedIds = new Set(saved.map(holding => holding.id));
+  let nextAdded = 0;
+  return edited.map(holding => ({
+    id: savedIds.has(holding.id) ? holding.id : addedIds[nextAdded++],
+    symbol: holding.symbol,
+    name: holding.name,
+    shares: holding.shares,
+    current_price: holding.currentPrice,
+    purchase_price: holding.purchasePrice,
+    purchase_date: holding.purchaseDate,
+    sector: holding.sector,
+    currency: holding.currency || 'USD'
+  }));
+}
+
+export interface HoldingsPatchResponse {
+  portfolio_id: string;
+  message: string;
+  portfolio: { version: number };
+  added_holding_ids: string[]; // add 연산 순서
+}
+
+export async function patchPortfolioHoldings(
+  portfolioId: string,
+  version: number,
+  operations: HoldingPatchOperation[]
+): Promise<HoldingsPatchResponse> {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}/holdings`, {
+      method: 'PATCH',
+      headers: authHeaders({
+        'Content-Type': 'application/json',
+      }),
+      body: JSON.stringify({ version, operations }),
+    });
+
+    if (!response.ok) {
+      if (response.status === 409) {
+        throw await conflictError(response);
+      }
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'ETF 보유 정보 수정 실패');
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('ETF 보유 정보 수정 오류:', error);
+    throw error;
+  }
+}
+
 export async function deletePortfolio(portfolioId: string): Promise<{ message: string }> {
   try {
     const response = await fetch(`${API_BASE_URL}/api/portfolios/${portfolioId}`, {
       method: 'DELETE',
+      headers: authHeaders(),
     });
     
     if (!response.ok) {
@@ -1,5 +1,6 @@
-import { ETFHolding, SectorType, SectorAllocation, SectorRebalanceRecommendation } from '@/types/portfolio';
-import { calculateETFValueInKRW } from './currencyConverter';
+import { ETFHolding, SectorType, SectorAllocation, SectorRebalanceRecommendation, PortfolioSummary } from '@/types/portfolio';
+import { calculateETFValueInKRW, getUSDToKRWRate } from './currencyConverter';
+import { getPortfolioSectors } from './portfolioApi';
 
 // 목표 포트폴리오 비중
 export const TARGET_ALLOCATION = {
@@ -151,4 +152,48 @@ export async function calculatePortfolioSummary(etfs: ETFHolding[]) {
     dayChange: 0, // 일일 변화는 실시간 데이터가 필요하므로 0으로 설정
     dayChangePercent: 0
   };
-}
\ No newline at end of file
+}
+
+/**
+ * 저장된 포트폴리오의 섹터별 배분/리밸런싱 권장사항/요약을 서버 집계로 조회
+ * (보유 종목을 브라우저에서 다시 묶지 않음, 저장 전 입력값은 위의 calculate* 함수 사용)
+ */
+export async function fetchSectorAnalysis(portfolioId: string): Promise<{
+  allocations: SectorAllocation[];
+  recommendations: SectorRebalanceRecommendation[];
+  summary: PortfolioSummary;
+}> {
+  const usdToKrwRate = await getUSDToKRWRate();
+  const result = await getPortfolioSectors(portfolioId, usdToKrwRate);
+
+  const allocations: SectorAllocation[] = result.allocations.map(allocation => ({
+    sector: allocation.sector as SectorType,
+    sectorName: allocation.sector_name,
+    value: allocation.value,
+    percentage: allocation.percentage,
+    targetPercentage: allocation.target_percentage,
+    color: SECTOR_COLORS[allocation.sector as SectorType]
+  }));
+
+  const recommendations: SectorRebalanceRecommendation[] = result.recommendations.map(recommendation => ({
+    sector: recommendation.sector as SectorType,
+    sectorName: recommendation.sector_name,
+    currentWeight: recommendation.current_weight,
+    targetWeight: recommendation.target_weight,
+    action: recommendation.action,
+    recommendedAmount: recommendation.recommended_amount
+  }));
+
+  const totalReturn = result.total_value - result.total_cost;
+  return {
+    allocations,
+    recommendations,
+    summary: {
+      totalValue: result.total_value,
+      totalReturn,
+      totalReturnPercent: result.total_cost > 0 ? (totalReturn / result.total_cost) * 100 : 0,
+      dayChange: 0,
+      dayChangePercent: 0
+    }
+  };
+}
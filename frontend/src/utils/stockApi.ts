@@ -1,3 +1,5 @@
+import { authHeaders } from './auth';
+
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 export interface StockInfo {
@@ -15,7 +17,9 @@ export async function getStockInfo(symbol: string): Promise<StockInfo | null> {
       return null;
     }
 
-    const response = await fetch(`${API_BASE_URL}/api/stock/${encodeURIComponent(symbol.trim())}`);
+    const response = await fetch(`${API_BASE_URL}/api/stock/${encodeURIComponent(symbol.trim())}`, {
+      headers: authHeaders(),
+    });
     
     if (!response.ok) {
       if (response.status === 404) {